@@ -2,6 +2,8 @@ import pygame
 import sys
 import math
 
+from connect4 import DEFAULT_SPEC
+
 # Colors
 BLUE = (0, 100, 200)
 BLACK = (0, 0, 0)
@@ -14,14 +16,24 @@ DARK_BLUE = (20, 40, 80)
 GREEN = (50, 200, 100)
 
 # Game constants
-ROW_COUNT = 6
-COLUMN_COUNT = 7
 SQUARESIZE = 100
-RADIUS = int(SQUARESIZE / 2 - 5)
 
-# Screen dimensions
-WIDTH = COLUMN_COUNT * SQUARESIZE
-HEIGHT = (ROW_COUNT + 1) * SQUARESIZE
+# Screen dimensions: the board (plus the strip above it) is sized to stay
+# within these bounds where its shape allows. The window itself is never
+# smaller than MIN_WINDOW either way, so the menus always fit; a board that
+# is narrower or shorter is centred in it
+MIN_WINDOW = 700
+MAX_WINDOW = 900
+
+# Frame cap for the game loop (the menus use the same rate)
+FPS = 60
+
+
+def square_size(rows, cols):
+    """Cell size in pixels for a rows x cols board."""
+    fit = MAX_WINDOW // max(cols, rows + 1)
+    fill = max(SQUARESIZE, MIN_WINDOW // cols, MIN_WINDOW // (rows + 1))
+    return min(fit, fill)
 
 
 class GameUI:
@@ -30,80 +42,108 @@ class GameUI:
     Separated from game logic for modularity.
     """
     
-    def __init__(self):
+    def __init__(self, spec=None):
+        spec = spec or DEFAULT_SPEC
+        self.rows = spec.rows
+        self.cols = spec.cols
+        self.square = square_size(self.rows, self.cols)
+        self.radius = int(self.square / 2 - 5)
+        self.board_width = self.cols * self.square
+        self.board_height = (self.rows + 1) * self.square
+        self.width = max(self.board_width, MIN_WINDOW)
+        self.height = max(self.board_height, MIN_WINDOW)
+        # Top-left corner of the board (and the strip above it) in the window
+        self.left = (self.width - self.board_width) // 2
+        self.top = (self.height - self.board_height) // 2
+        # Strip above the board used for the hover piece and messages
+        self.top_rect = (0, self.top, self.width, self.square)
+
         pygame.init()
-        self.screen = pygame.display.set_mode((WIDTH, HEIGHT))
+        self.screen = pygame.display.set_mode((self.width, self.height))
         pygame.display.set_caption("Connect 4 - AI Challenge")
         self.font_large = pygame.font.SysFont("arial", 60, bold=True)
         self.font_medium = pygame.font.SysFont("arial", 36, bold=True)
         self.font_small = pygame.font.SysFont("arial", 24)
         self.clock = pygame.time.Clock()
+        self.board_surface = self.render_empty_board()
         
-    def draw_board(self, board):
-        """Draw the Connect 4 board with current piece positions."""
-        # Draw blue board with holes
-        for c in range(COLUMN_COUNT):
-            for r in range(ROW_COUNT):
-                pygame.draw.rect(
-                    self.screen, 
-                    BLUE, 
-                    (c * SQUARESIZE, r * SQUARESIZE + SQUARESIZE, SQUARESIZE, SQUARESIZE)
-                )
+    def render_empty_board(self):
+        """Pre-render the blue board with its holes once; it is blitted after that."""
+        square = self.square
+        surface = pygame.Surface((self.board_width, self.board_height - square))
+        surface.fill(BLUE)
+        for c in range(self.cols):
+            for r in range(self.rows):
                 pygame.draw.circle(
-                    self.screen, 
+                    surface, 
                     BLACK, 
-                    (int(c * SQUARESIZE + SQUARESIZE / 2), int(r * SQUARESIZE + SQUARESIZE + SQUARESIZE / 2)), 
-                    RADIUS
+                    (int(c * square + square / 2), int(r * square + square / 2)), 
+                    self.radius
                 )
+        return surface
+    
+    def cell_rect(self, row, col):
+        """Screen rect of a board cell (row 0 is the top row)."""
+        square = self.square
+        return pygame.Rect(self.left + col * square, self.top + (row + 1) * square, square, square)
+    
+    def draw_board(self, board):
+        """Draw the Connect 4 board with current piece positions."""
+        self.screen.blit(self.board_surface, (self.left, self.top + self.square))
         
         # Draw pieces
-        # Note: board[0] is top row, board[5] is bottom row
-        # Screen y increases downward, with row 0 at y=SQUARESIZE
-        for c in range(COLUMN_COUNT):
-            for r in range(ROW_COUNT):
-                piece = board[r][c]
-                # Calculate y position: row 0 at top of board, row 5 at bottom
-                y_pos = int(r * SQUARESIZE + SQUARESIZE + SQUARESIZE / 2)
-                x_pos = int(c * SQUARESIZE + SQUARESIZE / 2)
-                
-                if piece == "X":
-                    pygame.draw.circle(self.screen, RED, (x_pos, y_pos), RADIUS)
-                elif piece == "O":
-                    pygame.draw.circle(self.screen, YELLOW, (x_pos, y_pos), RADIUS)
+        # Note: board[0] is top row, board[-1] is bottom row
+        # Screen y increases downward, with row 0 at y=self.top + self.square
+        for c in range(self.cols):
+            for r in range(self.rows):
+                if board[r][c] != " ":
+                    self._draw_disc(r, c, board[r][c])
         
         pygame.display.update()
     
+    def _draw_disc(self, row, col, piece):
+        color = RED if piece == "X" else YELLOW
+        pygame.draw.circle(self.screen, color, self.cell_rect(row, col).center, self.radius)
+    
+    def draw_piece(self, row, col, piece):
+        """Draw one newly dropped disc and update only its cell."""
+        self._draw_disc(row, col, piece)
+        pygame.display.update(self.cell_rect(row, col))
+    
     def draw_hover_piece(self, posx, turn):
         """Draw the hovering piece above the board."""
-        pygame.draw.rect(self.screen, BLACK, (0, 0, WIDTH, SQUARESIZE))
+        pygame.draw.rect(self.screen, BLACK, self.top_rect)
         color = RED if turn == 0 else YELLOW
-        pygame.draw.circle(self.screen, color, (posx, int(SQUARESIZE / 2)), RADIUS)
-        pygame.display.update()
+        half = self.square // 2
+        posx = min(max(posx, self.left + half), self.left + self.board_width - half)
+        pygame.draw.circle(self.screen, color, (posx, self.top + half), self.radius)
+        pygame.display.update(self.top_rect)
     
     def clear_top(self):
         """Clear the top area of the screen."""
-        pygame.draw.rect(self.screen, BLACK, (0, 0, WIDTH, SQUARESIZE))
-        pygame.display.update()
+        pygame.draw.rect(self.screen, BLACK, self.top_rect)
+        pygame.display.update(self.top_rect)
     
     def show_winner(self, winner_text, color):
         """Display the winner message."""
-        pygame.draw.rect(self.screen, BLACK, (0, 0, WIDTH, SQUARESIZE))
+        pygame.draw.rect(self.screen, BLACK, self.top_rect)
         label = self.font_large.render(winner_text, True, color)
-        label_rect = label.get_rect(center=(WIDTH // 2, SQUARESIZE // 2))
+        label_rect = label.get_rect(center=(self.width // 2, self.top + self.square // 2))
         self.screen.blit(label, label_rect)
-        pygame.display.update()
+        pygame.display.update(self.top_rect)
     
     def show_draw(self):
         """Display draw message."""
-        pygame.draw.rect(self.screen, BLACK, (0, 0, WIDTH, SQUARESIZE))
+        pygame.draw.rect(self.screen, BLACK, self.top_rect)
         label = self.font_large.render("It's a Draw!", True, WHITE)
-        label_rect = label.get_rect(center=(WIDTH // 2, SQUARESIZE // 2))
+        label_rect = label.get_rect(center=(self.width // 2, self.top + self.square // 2))
         self.screen.blit(label, label_rect)
-        pygame.display.update()
+        pygame.display.update(self.top_rect)
     
     def get_column_from_mouse(self, posx):
         """Convert mouse x position to column index."""
-        return int(math.floor(posx / SQUARESIZE))
+        col = int(math.floor((posx - self.left) / self.square))
+        return min(max(col, 0), self.cols - 1)
     
     def draw_button(self, rect, text, color, text_color=WHITE, hover=False):
         """Draw a styled button."""
@@ -124,19 +164,19 @@ class GameUI:
         
         # Title
         title = self.font_large.render("CONNECT 4", True, YELLOW)
-        title_rect = title.get_rect(center=(WIDTH // 2, 100))
+        title_rect = title.get_rect(center=(self.width // 2, 100))
         self.screen.blit(title, title_rect)
         
         # Subtitle
         subtitle = self.font_small.render("AI Challenge Edition", True, WHITE)
-        subtitle_rect = subtitle.get_rect(center=(WIDTH // 2, 160))
+        subtitle_rect = subtitle.get_rect(center=(self.width // 2, 160))
         self.screen.blit(subtitle, subtitle_rect)
         
         # Start button
-        start_button = pygame.Rect(WIDTH // 2 - 150, 280, 300, 70)
+        start_button = pygame.Rect(self.width // 2 - 150, 280, 300, 70)
         
         # Quit button
-        quit_button = pygame.Rect(WIDTH // 2 - 150, 380, 300, 70)
+        quit_button = pygame.Rect(self.width // 2 - 150, 380, 300, 70)
         
         while True:
             mouse_pos = pygame.mouse.get_pos()
@@ -158,7 +198,7 @@ class GameUI:
                     if quit_button.collidepoint(event.pos):
                         return None
             
-            self.clock.tick(60)
+            self.clock.tick(FPS)
     
     def show_game_mode_menu(self):
         """
@@ -173,22 +213,22 @@ class GameUI:
         
         # Title
         title = self.font_large.render("Select Mode", True, WHITE)
-        title_rect = title.get_rect(center=(WIDTH // 2, 100))
+        title_rect = title.get_rect(center=(self.width // 2, 100))
         self.screen.blit(title, title_rect)
         
         # Mode buttons
         button_height = 70
         button_width = 350
         
-        pvp_button = pygame.Rect(WIDTH // 2 - button_width // 2, 200, button_width, button_height)
-        ai_button = pygame.Rect(WIDTH // 2 - button_width // 2, 310, button_width, button_height)
-        back_button = pygame.Rect(20, HEIGHT - 70, 120, 50)
+        pvp_button = pygame.Rect(self.width // 2 - button_width // 2, 200, button_width, button_height)
+        ai_button = pygame.Rect(self.width // 2 - button_width // 2, 310, button_width, button_height)
+        back_button = pygame.Rect(20, self.height - 70, 120, 50)
         
         while True:
             mouse_pos = pygame.mouse.get_pos()
             
             # Redraw background
-            pygame.draw.rect(self.screen, DARK_BLUE, (0, 180, WIDTH, 250))
+            pygame.draw.rect(self.screen, DARK_BLUE, (0, 180, self.width, 250))
             
             # Draw mode buttons
             pvp_hover = pvp_button.collidepoint(mouse_pos)
@@ -197,12 +237,12 @@ class GameUI:
             
             self.draw_button(pvp_button, "Player vs Player", BLUE, WHITE, pvp_hover)
             pvp_desc = self.font_small.render("Two players take turns", True, LIGHT_GRAY)
-            pvp_desc_rect = pvp_desc.get_rect(center=(WIDTH // 2, pvp_button.bottom + 15))
+            pvp_desc_rect = pvp_desc.get_rect(center=(self.width // 2, pvp_button.bottom + 15))
             self.screen.blit(pvp_desc, pvp_desc_rect)
             
             self.draw_button(ai_button, "Player vs AI", GREEN, WHITE, ai_hover)
             ai_desc = self.font_small.render("Challenge the computer", True, LIGHT_GRAY)
-            ai_desc_rect = ai_desc.get_rect(center=(WIDTH // 2, ai_button.bottom + 15))
+            ai_desc_rect = ai_desc.get_rect(center=(self.width // 2, ai_button.bottom + 15))
             self.screen.blit(ai_desc, ai_desc_rect)
             
             self.draw_button(back_button, "Back", GRAY, WHITE, back_hover)
@@ -220,22 +260,23 @@ class GameUI:
                     if back_button.collidepoint(event.pos):
                         return -1
             
-            self.clock.tick(60)
+            self.clock.tick(FPS)
     
     def show_difficulty_menu(self):
         """
         Display difficulty selection menu.
-        Returns: difficulty level (1-4) or None if back/quit.
+        Returns: difficulty level (1-5) or None if back/quit.
             1 = Easy (Random)
             2 = Normal (Greedy Heuristic)
             3 = Hard (Minimax without Alpha-Beta)
             4 = Very Hard (Minimax with Alpha-Beta)
+            5 = Expert (Monte Carlo Tree Search)
         """
         self.screen.fill(DARK_BLUE)
         
         # Title
         title = self.font_large.render("Select Difficulty", True, WHITE)
-        title_rect = title.get_rect(center=(WIDTH // 2, 80))
+        title_rect = title.get_rect(center=(self.width // 2, 80))
         self.screen.blit(title, title_rect)
         
         # Difficulty buttons
@@ -248,22 +289,23 @@ class GameUI:
             ("Easy", GREEN, "Random moves"),
             ("Normal", YELLOW, "Greedy heuristic"),
             ("Hard", (255, 165, 0), "Minimax (depth 4)"),
-            ("Very Hard", RED, "Alpha-Beta (depth 5)")
+            ("Very Hard", RED, "Alpha-Beta (depth 5)"),
+            ("Expert", (150, 70, 220), "Monte Carlo tree search")
         ]
         
         buttons = []
         for i, (name, color, desc) in enumerate(difficulties):
-            btn_rect = pygame.Rect(WIDTH // 2 - button_width // 2, start_y + i * spacing, button_width, button_height)
+            btn_rect = pygame.Rect(self.width // 2 - button_width // 2, start_y + i * spacing, button_width, button_height)
             buttons.append((btn_rect, name, color, desc, i + 1))
         
         # Back button
-        back_button = pygame.Rect(20, HEIGHT - 70, 120, 50)
+        back_button = pygame.Rect(20, self.height - 70, 120, 50)
         
         while True:
             mouse_pos = pygame.mouse.get_pos()
             
             # Redraw background for descriptions
-            pygame.draw.rect(self.screen, DARK_BLUE, (0, start_y - 20, WIDTH, len(difficulties) * spacing + 100))
+            pygame.draw.rect(self.screen, DARK_BLUE, (0, start_y - 20, self.width, len(difficulties) * spacing + 100))
             
             # Draw difficulty buttons
             for btn_rect, name, color, desc, level in buttons:
@@ -272,7 +314,7 @@ class GameUI:
                 
                 # Description text
                 desc_surface = self.font_small.render(desc, True, LIGHT_GRAY)
-                desc_rect = desc_surface.get_rect(center=(WIDTH // 2, btn_rect.bottom + 15))
+                desc_rect = desc_surface.get_rect(center=(self.width // 2, btn_rect.bottom + 15))
                 self.screen.blit(desc_surface, desc_rect)
             
             # Draw back button
@@ -291,33 +333,44 @@ class GameUI:
                     if back_button.collidepoint(event.pos):
                         return -1  # Signal to go back
             
-            self.clock.tick(60)
+            self.clock.tick(FPS)
     
-    def show_thinking(self):
-        """Show AI thinking indicator."""
-        pygame.draw.rect(self.screen, BLACK, (0, 0, WIDTH, SQUARESIZE))
-        label = self.font_medium.render("AI is thinking...", True, YELLOW)
-        label_rect = label.get_rect(center=(WIDTH // 2, SQUARESIZE // 2))
-        self.screen.blit(label, label_rect)
-        pygame.display.update()
+    def show_thinking(self, dots=3):
+        """
+        Show AI thinking indicator. Call again with dots = 0..3 to animate
+        it; the text stays put while the dots change.
+        """
+        pygame.draw.rect(self.screen, BLACK, self.top_rect)
+        full_rect = self.font_medium.render("AI is thinking...", True, YELLOW).get_rect(
+            center=(self.width // 2, self.top + self.square // 2)
+        )
+        label = self.font_medium.render("AI is thinking" + "." * dots, True, YELLOW)
+        self.screen.blit(label, label.get_rect(midleft=full_rect.midleft))
+        pygame.display.update(self.top_rect)
     
     def wait(self, milliseconds):
         """Wait for specified milliseconds."""
         pygame.time.wait(milliseconds)
     
+    def tick(self, fps=FPS):
+        """Sleep out the rest of the frame so the game loop doesn't spin."""
+        self.clock.tick(fps)
+    
     def process_events(self):
         """
-        Process pygame events.
-        Returns: dict with event information or None for quit.
+        Process the pygame events queued since the last call.
+        Returns: dict with event information. A quit wins over a click and
+        a click over motion; of several motions only the latest counts.
         """
+        result = {"type": "none"}
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 return {"type": "quit"}
-            if event.type == pygame.MOUSEMOTION:
-                return {"type": "motion", "pos": event.pos}
-            if event.type == pygame.MOUSEBUTTONDOWN:
-                return {"type": "click", "pos": event.pos}
-        return {"type": "none"}
+            if event.type == pygame.MOUSEBUTTONDOWN and result["type"] != "click":
+                result = {"type": "click", "pos": event.pos}
+            elif event.type == pygame.MOUSEMOTION and result["type"] != "click":
+                result = {"type": "motion", "pos": event.pos}
+        return result
     
     def quit(self):
         """Clean up pygame."""
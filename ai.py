@@ -1,134 +1,196 @@
 import random 
+import time
 from connect4 import (
-    ROW_COUNT,
-    COLUMN_COUNT,
+    DEFAULT_SPEC,
     is_valid_location,
-    get_next_open_row,
-    winning_move
+    drop_piece,
+    winning_move_at,
+    is_symmetric,
+    GameState
 )
+from transposition import (
+    EXACT,
+    LOWER,
+    UPPER,
+    ZOBRIST,
+    ZOBRIST_MAX,
+    ZOBRIST_MIRROR,
+    TranspositionTable,
+    canonical_key,
+    mirror_table,
+    zobrist_hash,
+    zobrist_table
+)
+from solver import Solver, SolverTimeout, empty_cells, solve_board
+from ordering import MoveOrderer
+from evaluator import Evaluator
+from threats import analyse, candidate_cells
+
+# ai_minimax_ab_move switches to the exact solver at or below this many
+# empty cells (solved in well under a second on one core)
+SOLVER_EMPTY_CELLS = 20
 
 # UTILITIES
 def get_valid_locations(board):
-    return [c for c in range(COLUMN_COUNT) if is_valid_location(board, c)]
+    return [c for c in range(len(board[0])) if is_valid_location(board, c)]
 
 def drop_temp(board, row, col, piece):
-    """Return a NEW board with a move applied (used for simulation only)."""
+    """
+    Return a NEW board with a move applied. The searches play on a
+    connect4.GameState instead; this is kept for callers outside them.
+    """
     temp = [r[:] for r in board]
-    temp[row][col] = piece
+    drop_piece(temp, row, col, piece)
     return temp
 
+def pick_tied(cols, rng=None, default=None):
+    """
+    Root tie-breaking policy: the first column in search order by default,
+    or a random one from a seeded random.Random passed in per game.
+    default is returned when cols is empty.
+    """
+    if not cols:
+        return default
+    if rng is None or len(cols) == 1:
+        return cols[0]
+    return rng.choice(cols)
 
 
 # 1. RANDOM AI (baseline)
-def ai_random_move(board):
-    """Completely random valid column."""
+def ai_random_move(board, rng=None):
+    """Completely random valid column (pass rng for reproducible games)."""
     valid = get_valid_locations(board)
-    return random.choice(valid)
+    return (rng or random).choice(valid)
 
 
 # 2. HEURISTIC-BASED (NO MINIMAX)
 def count_window(window, piece):
-    """Score a group of 4 cells."""
+    """Score a group of cells (4 of them on the standard board)."""
     opp_piece = "O" if piece == "X" else "X"
+    size = len(window)
 
     score = 0
-    if window.count(piece) == 4:
+    if window.count(piece) == size:
         score += 100
-    elif window.count(piece) == 3 and window.count(" ") == 1:
+    elif window.count(piece) == size - 1 and window.count(" ") == 1:
         score += 5
-    elif window.count(piece) == 2 and window.count(" ") == 2:
+    elif window.count(piece) == size - 2 and window.count(" ") == 2:
         score += 2
 
-    if window.count(opp_piece) == 3 and window.count(" ") == 1:
+    if window.count(opp_piece) == size - 1 and window.count(" ") == 1:
         score -= 4
 
     return score
 
 
-def score_position(board, piece):
-    """Heuristic scoring function used by both greedy and minimax."""
-    opp_piece = "O" if piece == "X" else "X"
+def score_position(board, piece, spec=None):
+    """
+    Heuristic scoring function used by both greedy and minimax.
+    spec is the board's connect4.BoardSpec; its precomputed lines are the
+    horizontal, vertical and diagonal windows.
+    """
+    spec = spec or DEFAULT_SPEC
     score = 0
 
     # Score center column
-    center = COLUMN_COUNT // 2
-    center_col = [board[r][center] for r in range(ROW_COUNT)]
-    score += center_col.count(piece) * 3
-
-    # Horizontal
-    for r in range(ROW_COUNT):
-        row_array = board[r]
-        for c in range(COLUMN_COUNT - 3):
-            window = row_array[c:c+4]
-            score += count_window(window, piece)
-
-    # Vertical
-    for c in range(COLUMN_COUNT):
-        col_array = [board[r][c] for r in range(ROW_COUNT)]
-        for r in range(ROW_COUNT - 3):
-            window = col_array[r:r+4]
-            score += count_window(window, piece)
-
-    # Positive diagonals
-    for r in range(ROW_COUNT - 3):
-        for c in range(COLUMN_COUNT - 3):
-            window = [board[r+i][c+i] for i in range(4)]
-            score += count_window(window, piece)
-
-    # Negative diagonals
-    for r in range(3, ROW_COUNT):
-        for c in range(COLUMN_COUNT - 3):
-            window = [board[r-i][c+i] for i in range(4)]
-            score += count_window(window, piece)
+    for row, weights in zip(board, spec.center_weight):
+        for cell, weight in zip(row, weights):
+            if weight and cell == piece:
+                score += 3 * weight
+
+    for line in spec.lines:
+        score += count_window([board[r][c] for r, c in line], piece)
 
     return score
 
 
-def ai_greedy_move(board, ai_piece="O"):
+def ai_greedy_move(board, ai_piece="O", rng=None, spec=None):
     """
     GREEDY HEURISTIC AI:
     Looks at all possible moves and picks the one with the highest heuristic score.
     (No minimax, just one-step evaluation)
     """
-    valid = get_valid_locations(board)
+    state = GameState(board, spec)
+    evaluator = Evaluator(state.board, ai_piece, state.spec)
+    valid = state.valid_locations()
     best_score = -999999
-    best_col = random.choice(valid)
+    best_cols = [valid[0]]
 
     for col in valid:
-        row = get_next_open_row(board, col)
-        temp = drop_temp(board, row, col, ai_piece)
-        score = score_position(temp, ai_piece)
+        row = state.play(col, ai_piece)
+        evaluator.play(row, col, ai_piece)
+        score = evaluator.score  # == score_position(state.board, ai_piece)
+        evaluator.undo(row, col, ai_piece)
+        state.undo()
 
         if score > best_score:
             best_score = score
-            best_col = col
+            best_cols = [col]
+        elif score == best_score:
+            best_cols.append(col)
 
-    return best_col
+    return pick_tied(best_cols, rng)
 
 
 
 
 # 3. MINIMAX without alpha-beta
-def minimax(board, depth, maximizingPlayer, ai_piece):
+def minimax(board, depth, maximizingPlayer, ai_piece, evaluator=None, stats=None, stop=None,
+            spec=None):
+    """
+    board is a list board (copied once into a connect4.GameState) or a
+    GameState; the search plays and undoes moves on it in place.
+
+    evaluator is the incremental evaluator.Evaluator for this board; one is
+    created at the root and passed down, so leaves don't rescan the board.
+
+    stats is an optional stats.SearchStats that counts the work done.
+    stop is any flag with is_set(); once it is set the search raises
+    SearchTimeout.
+
+    spec is the connect4.BoardSpec of a list board (a GameState has its own).
+    """
+    if stop is not None and stop.is_set():
+        raise SearchTimeout
+
+    state = board if isinstance(board, GameState) else GameState(board, spec)
+    spec = state.spec
+    if evaluator is None:
+        evaluator = Evaluator(state.board, ai_piece, spec)
+    if stats is not None:
+        stats.visit()
+
     opp_piece = "O" if ai_piece == "X" else "X"
-    valid = get_valid_locations(board)
+    valid = state.valid_locations()
 
-    # Terminal checks
-    if winning_move(board, ai_piece):
-        return (None, 10_000_000)
-    if winning_move(board, opp_piece):
-        return (None, -10_000_000)
+    # Terminal checks (wins are caught by the parent via winning_move_at)
     if depth == 0 or len(valid) == 0:
-        return (None, score_position(board, ai_piece))
+        if stats is not None:
+            stats.leaf_evals += 1
+        return (None, evaluator.score)
+
+    if stats is not None:
+        stats.expanded += 1
+        stats.children += len(valid)
+        stats.win_checks += len(valid)
 
     if maximizingPlayer:
         value = -999999
-        best_col = random.choice(valid)
+        best_col = valid[0]
 
         for col in valid:
-            row = get_next_open_row(board, col)
-            temp = drop_temp(board, row, col, ai_piece)
-            _, new_score = minimax(temp, depth - 1, False, ai_piece)
+            row = state.play(col, ai_piece)
+            if winning_move_at(state.board, row, col, ai_piece, spec):
+                new_score = 10_000_000
+            else:
+                evaluator.play(row, col, ai_piece)
+                if stats is not None:
+                    stats.path.append(col)
+                _, new_score = minimax(state, depth - 1, False, ai_piece, evaluator, stats, stop)
+                if stats is not None:
+                    stats.path.pop()
+                evaluator.undo(row, col, ai_piece)
+            state.undo()
 
             if new_score > value:
                 value = new_score
@@ -138,12 +200,21 @@ def minimax(board, depth, maximizingPlayer, ai_piece):
 
     else:
         value = 999999
-        best_col = random.choice(valid)
+        best_col = valid[0]
 
         for col in valid:
-            row = get_next_open_row(board, col)
-            temp = drop_temp(board, row, col, opp_piece)
-            _, new_score = minimax(temp, depth - 1, True, ai_piece)
+            row = state.play(col, opp_piece)
+            if winning_move_at(state.board, row, col, opp_piece, spec):
+                new_score = -10_000_000
+            else:
+                evaluator.play(row, col, opp_piece)
+                if stats is not None:
+                    stats.path.append(col)
+                _, new_score = minimax(state, depth - 1, True, ai_piece, evaluator, stats, stop)
+                if stats is not None:
+                    stats.path.pop()
+                evaluator.undo(row, col, opp_piece)
+            state.undo()
 
             if new_score < value:
                 value = new_score
@@ -151,36 +222,198 @@ def minimax(board, depth, maximizingPlayer, ai_piece):
 
         return best_col, value
 
-def ai_minimax_move(board, ai_piece="O", depth=3):
-    col, _ = minimax(board, depth, True, ai_piece)
-    return col
+def ai_minimax_move(board, ai_piece="O", depth=3, rng=None, stats=None, stop=None, spec=None):
+    """
+    Plain minimax to depth. Setting stop (e.g. a threading.Event) from
+    another thread cancels the search with SearchTimeout.
+    """
+    if stats is not None:
+        stats.begin_iteration(depth)
+    if rng is None:
+        col, _ = minimax(board, depth, True, ai_piece, stats=stats, stop=stop, spec=spec)
+        if stats is not None:
+            stats.end_iteration(depth)
+        return col
+
+    # Same as the root of minimax, but keep every move with the best score
+    state = GameState(board, spec)
+    valid = state.valid_locations()
+    if stats is not None:
+        stats.visit()
+        stats.expanded += 1
+        stats.children += len(valid)
+        stats.win_checks += len(valid)
+    scores = {}
+    for col in valid:
+        row = state.play(col, ai_piece)
+        if winning_move_at(state.board, row, col, ai_piece, state.spec):
+            scores[col] = 10_000_000
+        else:
+            if stats is not None:
+                stats.path.append(col)
+            _, scores[col] = minimax(state, depth - 1, False, ai_piece, stats=stats, stop=stop)
+            if stats is not None:
+                stats.path.pop()
+        state.undo()
+    if stats is not None:
+        stats.end_iteration(depth)
+
+    best = max(scores.values())
+    return pick_tied([col for col in scores if scores[col] == best], rng)
 
 
 
 
 # 4. MINIMAX with alpha-beta
-def minimax_alpha_beta(board, depth, alpha, beta, maximizingPlayer, ai_piece):
+class SearchTimeout(Exception):
+    """Raised inside the searches when the deadline passes or stop is set."""
+
+
+def minimax_alpha_beta(board, depth, alpha, beta, maximizingPlayer, ai_piece,
+                       tt=None, key=None, deadline=None, first_col=None, stop=None,
+                       orderer=None, ply=0, evaluator=None, stats=None, spec=None,
+                       mirror_key=None):
+    """
+    Alpha-beta search. board is a list board (copied once into a
+    connect4.GameState) or a GameState that is played on in place.
+
+    If a TranspositionTable is passed as tt, results are stored and reused
+    across transpositions; key is the Zobrist hash of this node and
+    mirror_key that of its mirror image (both computed from the board when
+    omitted). Mirror images share an entry (transposition.canonical_key).
+
+    At the root (ply 0) of a left-right symmetric position only one of
+    every pair of mirrored moves is searched.
+
+    Every node is checked for threats first (threats.candidate_cells): a
+    win for the side to move is returned at once, and otherwise only the
+    forced block, or the moves that don't hand the opponent a win, are
+    searched.
+
+    deadline is a time.perf_counter() value; once it passes the search raises
+    SearchTimeout. stop is any flag with is_set() (threading.Event,
+    parallel.SharedFlag) that aborts the search the same way. first_col is
+    searched first at this node (used at the root by iterative deepening).
+
+    orderer is an ordering.MoveOrderer (killer and history heuristics); ply
+    is the distance from the root and indexes its killer moves.
+
+    evaluator is the incremental evaluator.Evaluator (created at the root
+    when omitted). stats is an optional stats.SearchStats.
+
+    spec is the connect4.BoardSpec of a list board (a GameState has its own).
+    """
+    if deadline is not None and time.perf_counter() >= deadline:
+        raise SearchTimeout
+    if stop is not None and stop.is_set():
+        raise SearchTimeout
+
+    if orderer is not None:
+        orderer.nodes += 1
+    if stats is not None:
+        stats.visit()
+    state = board if isinstance(board, GameState) else GameState(board, spec)
+    spec = state.spec
+    if evaluator is None:
+        evaluator = Evaluator(state.board, ai_piece, spec)
+
     opp_piece = "O" if ai_piece == "X" else "X"
-    valid = get_valid_locations(board)
+    valid = state.valid_locations()
 
-    # Terminal checks
-    if winning_move(board, ai_piece):
-        return (None, 10_000_000)
-    if winning_move(board, opp_piece):
-        return (None, -10_000_000)
+    # Terminal checks (wins are caught by the parent via winning_move_at)
     if depth == 0 or len(valid) == 0:
-        return (None, score_position(board, ai_piece))
+        if stats is not None:
+            stats.leaf_evals += 1
+        return (None, evaluator.score)
+
+    tt_col = None
+    if tt is not None:
+        if spec is DEFAULT_SPEC:
+            keys, mirror = ZOBRIST, ZOBRIST_MIRROR
+        else:
+            keys, mirror = zobrist_table(spec), mirror_table(spec)
+        side = ZOBRIST_MAX if maximizingPlayer else 0
+        if key is None:
+            key = zobrist_hash(state.board, keys) ^ side
+        if mirror_key is None:
+            mirror_key = zobrist_hash(state.board, mirror) ^ side
+        tt_key, flipped = canonical_key(key, mirror_key)
+        alpha_orig, beta_orig = alpha, beta
+
+        entry = tt.probe(tt_key)
+        if stats is not None:
+            stats.tt_probes += 1
+            stats.tt_hits += entry is not None
+        if entry is not None:
+            _, entry_depth, flag, entry_value, tt_col = entry
+            if flipped and tt_col is not None:
+                tt_col = spec.cols - 1 - tt_col
+            if entry_depth >= depth:
+                if flag == EXACT:
+                    if stats is not None:
+                        stats.tt_cutoffs += 1
+                    return tt_col, entry_value
+                if flag == LOWER:
+                    alpha = max(alpha, entry_value)
+                else:
+                    beta = min(beta, entry_value)
+                if alpha >= beta:
+                    if stats is not None:
+                        stats.tt_cutoffs += 1
+                    return tt_col, entry_value
+
+    # Threats: a win ends the search here, and moves that lose at once
+    # (not blocking, or playing under an opponent's winning cell) are dropped
+    mover = ai_piece if maximizingPlayer else opp_piece
+    other = opp_piece if maximizingPlayer else ai_piece
+    cells, wins = candidate_cells(state.bits[mover], state.bits[other], state.mask, spec)
+    if stats is not None:
+        stats.win_checks += 1
+    heights, cell_bits = state.heights, state.cell_bits
+    if wins:
+        valid.sort(key=lambda c: abs(c - spec.center))
+        for col in valid:
+            if cell_bits[heights[col]][col] & wins:
+                return col, 10_000_000 if maximizingPlayer else -10_000_000
+    valid = [col for col in valid if cell_bits[heights[col]][col] & cells]
+
+    # Move ordering: the given first move or the stored best move goes first
+    hint = first_col if first_col is not None else tt_col
+    if orderer is not None:
+        valid = orderer.order(state, valid, ply, mover, hint)
+    else:
+        valid.sort(key=lambda c: abs(c - spec.center))
+        if hint in valid:
+            valid.remove(hint)
+            valid.insert(0, hint)
 
-    valid.sort(key=lambda c: abs(c - COLUMN_COUNT // 2))
+    if ply == 0 and is_symmetric(state.board):
+        # A move and its mirror image score the same: keep the first of each pair
+        last = spec.cols - 1
+        valid = [col for i, col in enumerate(valid) if last - col not in valid[:i]]
 
     if maximizingPlayer:
         value = -999999
-        best_col = random.choice(valid)
-
-        for col in valid:
-            row = get_next_open_row(board, col)
-            temp = drop_temp(board, row, col, ai_piece)
-            _, new_score = minimax_alpha_beta(temp, depth - 1, alpha, beta, False, ai_piece)
+        best_col = valid[0]
+
+        for i, col in enumerate(valid):
+            # No move wins here (that returned above), so go straight down
+            row = state.play(col, ai_piece)
+            child_key = child_mirror = None
+            if tt is not None:
+                child_key = key ^ keys[ai_piece][row][col] ^ ZOBRIST_MAX
+                child_mirror = mirror_key ^ mirror[ai_piece][row][col] ^ ZOBRIST_MAX
+            evaluator.play(row, col, ai_piece)
+            if stats is not None:
+                stats.path.append(col)
+            _, new_score = minimax_alpha_beta(state, depth - 1, alpha, beta, False, ai_piece,
+                                              tt, child_key, deadline, None, stop,
+                                              orderer, ply + 1, evaluator, stats,
+                                              mirror_key=child_mirror)
+            if stats is not None:
+                stats.path.pop()
+            evaluator.undo(row, col, ai_piece)
+            state.undo()
 
             if new_score > value:
                 value = new_score
@@ -188,18 +421,33 @@ def minimax_alpha_beta(board, depth, alpha, beta, maximizingPlayer, ai_piece):
 
             alpha = max(alpha, value)
             if alpha >= beta:
+                if orderer is not None:
+                    orderer.record_cutoff(ply, mover, row, col, depth, i)
+                if stats is not None:
+                    stats.cutoff(ply)
                 break
 
-        return best_col, value
-
     else:
         value = 999999
-        best_col = random.choice(valid)
-
-        for col in valid:
-            row = get_next_open_row(board, col)
-            temp = drop_temp(board, row, col, opp_piece)
-            _, new_score = minimax_alpha_beta(temp, depth - 1, alpha, beta, True, ai_piece)
+        best_col = valid[0]
+
+        for i, col in enumerate(valid):
+            row = state.play(col, opp_piece)
+            child_key = child_mirror = None
+            if tt is not None:
+                child_key = key ^ keys[opp_piece][row][col] ^ ZOBRIST_MAX
+                child_mirror = mirror_key ^ mirror[opp_piece][row][col] ^ ZOBRIST_MAX
+            evaluator.play(row, col, opp_piece)
+            if stats is not None:
+                stats.path.append(col)
+            _, new_score = minimax_alpha_beta(state, depth - 1, alpha, beta, True, ai_piece,
+                                              tt, child_key, deadline, None, stop,
+                                              orderer, ply + 1, evaluator, stats,
+                                              mirror_key=child_mirror)
+            if stats is not None:
+                stats.path.pop()
+            evaluator.undo(row, col, opp_piece)
+            state.undo()
 
             if new_score < value:
                 value = new_score
@@ -207,13 +455,214 @@ def minimax_alpha_beta(board, depth, alpha, beta, maximizingPlayer, ai_piece):
 
             beta = min(beta, value)
             if alpha >= beta:
+                if orderer is not None:
+                    orderer.record_cutoff(ply, mover, row, col, depth, i)
+                if stats is not None:
+                    stats.cutoff(ply)
                 break
 
-        return best_col, value
+    if stats is not None:
+        stats.expanded += 1
+        stats.children += i + 1
+
+    if tt is not None:
+        if value <= alpha_orig:
+            flag = UPPER
+        elif value >= beta_orig:
+            flag = LOWER
+        else:
+            flag = EXACT
+        tt.store(tt_key, depth, flag, value, spec.cols - 1 - best_col if flipped else best_col)
+
+    return best_col, value
+
+
+
 
+def iterative_deepening(board, ai_piece, time_limit_ms, tt=None, max_depth=None,
+                        orderer=None, stats=None, stop=None, spec=None):
+    """
+    Search depth 1, 2, 3, ... until the time budget runs out and return
+    (col, score, depth) from the deepest search that finished. Each
+    iteration starts with the previous iteration's best move, and the
+    orderer's killer/history tables carry over between iterations.
+    stats (a stats.SearchStats) gets the time and nodes of each iteration.
+    Setting stop ends the search early like the deadline does.
+    """
+    deadline = time.perf_counter() + time_limit_ms / 1000
+    remaining = empty_cells(board)
+    if max_depth is None or max_depth > remaining:
+        max_depth = remaining
+
+    # Depth 1 always runs to completion so there is a move to return
+    if stats is not None:
+        stats.begin_iteration(1)
+    best_col, best_score = minimax_alpha_beta(board, 1, -999999, 999999, True, ai_piece, tt,
+                                              stop=stop, orderer=orderer, stats=stats, spec=spec)
+    if stats is not None:
+        stats.end_iteration(1)
+    completed = 1
+
+    for depth in range(2, max_depth + 1):
+        if abs(best_score) >= 10_000_000:
+            break  # forced win or loss found, deeper search won't change it
+        if stats is not None:
+            stats.begin_iteration(depth)
+        try:
+            col, score = minimax_alpha_beta(board, depth, -999999, 999999, True, ai_piece,
+                                            tt, deadline=deadline, first_col=best_col,
+                                            stop=stop, orderer=orderer, stats=stats, spec=spec)
+        except SearchTimeout:
+            if stats is not None:
+                stats.end_iteration(depth, completed=False)
+            break
+        if stats is not None:
+            stats.end_iteration(depth)
+        best_col, best_score, completed = col, score, depth
+
+    return best_col, best_score, completed
+
+
+def root_ties(board, depth, ai_piece, best_col, value, tt=None, orderer=None, deadline=None,
+              stats=None, stop=None, spec=None):
+    """
+    Every root move that scores as well as best_col at this depth. Each
+    other move is re-searched with a null window just below value, which
+    is cheap with a warm transposition table. On a symmetric board a move
+    takes the result of its mirror image instead.
+    """
+    ties = []
+    state = GameState(board, spec)
+    valid = state.valid_locations()
+    valid.sort(key=lambda c: abs(c - state.spec.center))
+    last = state.spec.cols - 1
+    symmetric = is_symmetric(state.board)
+    decided = {best_col}
+    if stats is not None:
+        stats.start("ties")
 
+    for col in valid:
+        if col == best_col or (symmetric and last - col in decided):
+            if col == best_col or last - col in ties:
+                ties.append(col)
+            decided.add(col)
+            continue
+        decided.add(col)
+        row = state.play(col, ai_piece)
+        if winning_move_at(state.board, row, col, ai_piece, state.spec):
+            score = 10_000_000
+        else:
+            if stats is not None:
+                stats.path.append(col)
+            try:
+                _, score = minimax_alpha_beta(state, depth - 1, value - 1, value, False, ai_piece,
+                                              tt, deadline=deadline, stop=stop, orderer=orderer,
+                                              ply=1, stats=stats)
+            except SearchTimeout:
+                # Out of time: the moves not checked yet are not ties, but
+                # best_col may not have been reached
+                if best_col not in ties:
+                    ties.append(best_col)
+                break
+            if stats is not None:
+                stats.path.pop()
+        state.undo()
+        if score >= value:
+            ties.append(col)
+
+    if stats is not None:
+        stats.stop()
+    return ties
 
 
-def ai_minimax_ab_move(board, ai_piece="O", depth=5):
-    col, _ = minimax_alpha_beta(board, depth, -999999, 999999, True, ai_piece)
-    return col
\ No newline at end of file
+def ai_minimax_ab_move(board, ai_piece="O", depth=5, tt=None, time_limit_ms=None,
+                       solver_threshold=SOLVER_EMPTY_CELLS, solver=None, orderer=None,
+                       rng=None, stats=None, stop=None, spec=None):
+    """
+    Pass the same TranspositionTable for every move of a game to reuse
+    the work from earlier searches. A MoveOrderer is created per move
+    unless one is passed in (its report() gives node and cutoff counts).
+
+    Without rng the result is deterministic; with a random.Random, equally
+    good root moves are chosen between at random (see root_ties).
+
+    With time_limit_ms set, depth is ignored and the search deepens one ply
+    at a time until the budget is spent (see iterative_deepening).
+
+    Once solver_threshold or fewer cells are empty the position is solved
+    exactly instead (pass a Solver to keep its table between moves). The
+    solver is written for the standard board, so other specs (see
+    connect4.BoardSpec) always use the heuristic search.
+
+    stats (a stats.SearchStats) collects counters and timings for the move;
+    stats.score is set to the chosen move's value (the solver's score in the
+    endgame, None when a forced move was played without searching).
+
+    stop (e.g. a threading.Event) cancels the search from another thread:
+    once it is set the call raises SearchTimeout.
+
+    A winning move, or the only move that doesn't lose at once, is played
+    without searching (see threats.py).
+    """
+    threats = analyse(board, ai_piece, spec)
+    if stats is not None:
+        stats.score = None
+    if threats["wins"]:
+        if stats is not None:
+            stats.score = 10_000_000
+        center = (spec or DEFAULT_SPEC).center
+        return pick_tied(sorted(threats["wins"], key=lambda c: abs(c - center)), rng)
+    if len(threats["candidates"]) == 1:
+        return threats["candidates"][0]
+
+    deadline = None
+    if time_limit_ms is not None:
+        deadline = time.perf_counter() + time_limit_ms / 1000
+
+    if (spec is None or spec == DEFAULT_SPEC) and empty_cells(board) <= solver_threshold:
+        if solver is None:
+            solver = Solver()
+        solver_nodes = solver.nodes
+        if stats is not None:
+            stats.start("solver")
+        try:
+            col, score = solve_board(board, ai_piece, solver, deadline, stop)
+            if stats is not None:
+                stats.score = score
+            return col
+        except SolverTimeout:
+            if stop is not None and stop.is_set():
+                raise SearchTimeout
+            # Out of time before the result was proven: use the heuristic
+            # search with whatever is left of the budget
+            time_limit_ms = max(1, (deadline - time.perf_counter()) * 1000)
+        finally:
+            if stats is not None:
+                stats.stop()
+                stats.solver_nodes += solver.nodes - solver_nodes
+
+    if orderer is None:
+        orderer = MoveOrderer(spec)
+
+    if time_limit_ms is not None:
+        if tt is None:
+            tt = TranspositionTable()
+        col, score, depth = iterative_deepening(board, ai_piece, time_limit_ms, tt,
+                                                orderer=orderer, stats=stats, stop=stop, spec=spec)
+    else:
+        if stats is not None:
+            stats.begin_iteration(depth)
+        col, score = minimax_alpha_beta(board, depth, -999999, 999999, True, ai_piece, tt,
+                                        stop=stop, orderer=orderer, stats=stats, spec=spec)
+        if stats is not None:
+            stats.end_iteration(depth)
+
+    if stats is not None:
+        stats.score = score
+    if rng is not None:
+        ties = root_ties(board, depth, ai_piece, col, score, tt, orderer, deadline, stats, stop,
+                         spec)
+        col = pick_tied(ties, rng, col)
+    if stop is not None and stop.is_set():
+        raise SearchTimeout  # iterative deepening and root_ties stop quietly
+    return col
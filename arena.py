@@ -0,0 +1,258 @@
+"""
+Headless AI-vs-AI arena.
+
+Plays round-robin matches between the AI levels on a process pool,
+alternating who moves first, streams every game to a JSONL file and prints
+win/draw/loss rates with 95% confidence intervals and Elo estimates. Use it
+to check that a speed-up didn't quietly make the AI weaker.
+
+    python arena.py --players random greedy minimax ab --games 200 --workers 8
+
+A player is a level name with an optional depth, e.g. "minimax:3" or "ab:6"
+(for "mcts" the number is the playout budget per move, e.g. "mcts:5000").
+--rows, --cols and --connect play on another board (see connect4.BoardSpec).
+"""
+
+import argparse
+import itertools
+import json
+import math
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from connect4 import (
+    create_board,
+    is_valid_location,
+    get_next_open_row,
+    drop_piece,
+    winning_move_at,
+    board_spec
+)
+from ai import ai_random_move, ai_greedy_move, ai_minimax_move, ai_minimax_ab_move
+from transposition import TranspositionTable
+from solver import Solver
+from mcts import MCTS, ai_mcts_move
+
+DEFAULT_DEPTHS = {"minimax": 4, "ab": 5, "mcts": 2000}
+LEVELS = ("random", "greedy", "minimax", "ab", "mcts")
+
+
+def parse_player(spec):
+    """Split "ab:6" into ("ab", 6). The depth (playouts for mcts) defaults per level."""
+    name, _, depth = spec.partition(":")
+    if name not in LEVELS:
+        raise ValueError(f"Unknown player {spec!r}; choose from {', '.join(LEVELS)}")
+    if not depth:
+        return name, DEFAULT_DEPTHS.get(name)
+    if not depth.isdigit() or int(depth) < 1:
+        raise ValueError(f"Bad depth in {spec!r}: the depth (or playouts) must be at least 1")
+    return name, int(depth)
+
+
+def make_player(spec, rng, geometry=None):
+    """
+    Return move(board, piece) for one game. Search state (transposition
+    table, solver, MCTS tree) lives for that game only, as in Connect4Game. geometry
+    is the connect4.BoardSpec played on (default: the standard board).
+    """
+    name, depth = parse_player(spec)
+    if name == "random":
+        return lambda board, piece: ai_random_move(board, rng)
+    if name == "greedy":
+        return lambda board, piece: ai_greedy_move(board, piece, rng, spec=geometry)
+    if name == "minimax":
+        return lambda board, piece: ai_minimax_move(board, piece, depth=depth, rng=rng,
+                                                    spec=geometry)
+    if name == "mcts":
+        mcts = MCTS(spec=geometry)
+        return lambda board, piece: ai_mcts_move(board, piece, playouts=depth, mcts=mcts,
+                                                 rng=rng)
+
+    tt = TranspositionTable()
+    solver = Solver()
+    return lambda board, piece: ai_minimax_ab_move(board, piece, depth=depth, tt=tt,
+                                                   solver=solver, rng=rng, spec=geometry)
+
+
+def play_game(x_spec, o_spec, seed, geometry=None):
+    """Play one game ("X" moves first). Returns a result dict."""
+    rng = random.Random(seed)
+    players = {"X": make_player(x_spec, rng, geometry), "O": make_player(o_spec, rng, geometry)}
+    board = create_board(geometry)
+    moves = []
+    piece = "X"
+    winner = "draw"
+    started = time.perf_counter()
+
+    while any(is_valid_location(board, c) for c in range(len(board[0]))):
+        col = players[piece](board, piece)
+        row = get_next_open_row(board, col)
+        drop_piece(board, row, col, piece)
+        moves.append(col)
+        if winning_move_at(board, row, col, piece, geometry):
+            winner = piece
+            break
+        piece = "O" if piece == "X" else "X"
+
+    return {
+        "x": x_spec,
+        "o": o_spec,
+        "seed": seed,
+        "winner": winner,
+        "moves": "".join(str(c) for c in moves),
+        "seconds": round(time.perf_counter() - started, 4),
+    }
+
+
+# STATISTICS
+def score_interval(wins, draws, losses, z=1.96):
+    """Mean score (win = 1, draw = 0.5) and its normal-approximation CI."""
+    n = wins + draws + losses
+    if n == 0:
+        return 0.5, 0.0, 1.0
+    score = (wins + 0.5 * draws) / n
+    variance = (wins * (1 - score) ** 2 + draws * (0.5 - score) ** 2
+                + losses * score ** 2) / n
+    margin = z * math.sqrt(variance / n)
+    return score, max(0.0, score - margin), min(1.0, score + margin)
+
+
+def elo_difference(score):
+    """Elo gap implied by a mean score, clamped to +-800 at 0% / 100%."""
+    if score <= 0:
+        return -800.0
+    if score >= 1:
+        return 800.0
+    return max(-800.0, min(800.0, -400 * math.log10(1 / score - 1)))
+
+
+def fit_ratings(results, players, iterations=2000, step=16.0):
+    """
+    Elo rating per player fitted to every game (mean rating 0), so players
+    that never met directly still get comparable numbers.
+    """
+    ratings = {p: 0.0 for p in players}
+    games = [(r["x"], r["o"], 1.0 if r["winner"] == "X" else 0.5 if r["winner"] == "draw" else 0.0)
+             for r in results]
+    for _ in range(iterations):
+        gradient = {p: 0.0 for p in players}
+        for x, o, actual in games:
+            expected = 1 / (1 + 10 ** ((ratings[o] - ratings[x]) / 400))
+            gradient[x] += actual - expected
+            gradient[o] -= actual - expected
+        for p in players:
+            ratings[p] += step * gradient[p] / max(1, len(games)) * len(players)
+        mean = sum(ratings.values()) / len(ratings)
+        for p in players:
+            ratings[p] = max(-2000.0, min(2000.0, ratings[p] - mean))
+    return ratings
+
+
+def summarize(results, players):
+    """Per-pairing W/D/L from the first player's side, plus fitted ratings."""
+    table = {}
+    for a, b in itertools.combinations(players, 2):
+        wins = draws = losses = 0
+        for r in results:
+            if {r["x"], r["o"]} != {a, b} or r["x"] == r["o"]:
+                continue
+            if r["winner"] == "draw":
+                draws += 1
+            elif (r["winner"] == "X") == (r["x"] == a):
+                wins += 1
+            else:
+                losses += 1
+        n = wins + draws + losses
+        score, low, high = score_interval(wins, draws, losses)
+        table[(a, b)] = {
+            "games": n,
+            "win": wins / n if n else 0.0,
+            "draw": draws / n if n else 0.0,
+            "loss": losses / n if n else 0.0,
+            "score": score,
+            "score_ci": (low, high),
+            "elo": elo_difference(score),
+            "elo_ci": (elo_difference(low), elo_difference(high)),
+        }
+    return table, fit_ratings(results, players)
+
+
+def print_summary(table, ratings):
+    print(f"\n{'pairing':<24}{'games':>6}{'win':>7}{'draw':>7}{'loss':>7}   {'Elo (95% CI)'}")
+    for (a, b), row in table.items():
+        print(f"{a + ' vs ' + b:<24}{row['games']:>6}{row['win']:>7.1%}{row['draw']:>7.1%}"
+              f"{row['loss']:>7.1%}   {row['elo']:+.0f} ({row['elo_ci'][0]:+.0f}, {row['elo_ci'][1]:+.0f})")
+    print("\nFitted ratings (mean 0):")
+    for player, rating in sorted(ratings.items(), key=lambda item: -item[1]):
+        print(f"  {player:<16}{rating:+.0f}")
+
+
+# RUNNING A TOURNAMENT
+def schedule(players, games_per_pair, seed):
+    """Round-robin games; the first mover alternates within every pairing."""
+    jobs = []
+    for a, b in itertools.combinations(players, 2):
+        for g in range(games_per_pair):
+            x, o = (a, b) if g % 2 == 0 else (b, a)
+            jobs.append((x, o, seed * 1_000_003 + len(jobs)))
+    return jobs
+
+
+def run_arena(players, games_per_pair, workers=None, out_path=None, seed=0, verbose=True,
+              geometry=None):
+    """Play every pairing and return the list of result dicts."""
+    for spec in players:
+        parse_player(spec)   # fail fast on typos, before starting the pool
+
+    jobs = schedule(players, games_per_pair, seed)
+    results = []
+    out = open(out_path, "a") if out_path else None
+    started = time.perf_counter()
+    try:
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+            futures = [pool.submit(play_game, *job, geometry) for job in jobs]
+            for done, future in enumerate(as_completed(futures), 1):
+                result = future.result()
+                results.append(result)
+                if out:
+                    out.write(json.dumps(result) + "\n")
+                    out.flush()
+                if verbose and (done % 50 == 0 or done == len(jobs)):
+                    print(f"{done}/{len(jobs)} games ({time.perf_counter() - started:.0f}s)")
+    finally:
+        if out:
+            out.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play AI levels against each other.")
+    parser.add_argument("--players", nargs="+", default=list(LEVELS),
+                        help="levels to include, optionally with a depth (e.g. ab:6)")
+    parser.add_argument("--games", type=int, default=100, help="games per pairing")
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: all cores)")
+    parser.add_argument("--out", default="arena_results.jsonl", help="JSONL file results are appended to")
+    parser.add_argument("--seed", type=int, default=0, help="base seed for reproducible runs")
+    parser.add_argument("--rows", type=int, default=6, help="board height (default 6)")
+    parser.add_argument("--cols", type=int, default=7, help="board width (default 7)")
+    parser.add_argument("--connect", type=int, default=4, help="discs in a row to win (default 4)")
+    args = parser.parse_args()
+
+    players = list(dict.fromkeys(args.players))
+    if len(players) < 2:
+        parser.error("need at least two different players")
+    try:
+        geometry = board_spec(args.rows, args.cols, args.connect)
+        results = run_arena(players, args.games, args.workers, args.out, args.seed,
+                            geometry=geometry)
+    except ValueError as e:
+        parser.error(str(e))
+
+    table, ratings = summarize(results, players)
+    print_summary(table, ratings)
+
+
+if __name__ == "__main__":
+    main()
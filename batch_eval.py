@@ -0,0 +1,91 @@
+"""
+Vectorised scoring of many boards at once (offline analysis and tuning).
+
+Boards are an N x ROW_COUNT x COLUMN_COUNT int8 array using
+    0 = empty, 1 = "X", 2 = "O"
+(boards_to_array converts the usual list-of-strings boards). Every line
+window is gathered with one precomputed index table instead of Python
+loops, so scores match ai.score_position exactly.
+
+Requires NumPy, which the game itself does not need:
+    pip install numpy
+"""
+
+import numpy as np
+
+from connect4 import ROW_COUNT, COLUMN_COUNT
+from evaluator import LINES, LINE_SCORE, CENTER, CENTER_WEIGHT, WINDOW
+
+EMPTY, X, O = 0, 1, 2
+PIECE_CODES = {" ": EMPTY, "X": X, "O": O}
+
+# Flat cell indices of every window: shape (69, 4)
+LINE_INDEX = np.array([[r * COLUMN_COUNT + c for r, c in line] for line in LINES], dtype=np.intp)
+CENTER_INDEX = np.array([r * COLUMN_COUNT + CENTER for r in range(ROW_COUNT)], dtype=np.intp)
+
+# Each of my discs counts 1 and each opponent disc counts WINDOW + 1, so the
+# sum over a window encodes (mine, theirs) as mine + (WINDOW + 1) * theirs
+_BASE = WINDOW + 1
+WINDOW_SCORE = np.zeros(_BASE * _BASE, dtype=np.int32)
+for _m in range(_BASE):
+    for _t in range(_BASE - _m):
+        WINDOW_SCORE[_m + _BASE * _t] = LINE_SCORE[_m][_t]
+
+# Boards scored per chunk; bounds the temporary (chunk, 69, 4) arrays
+CHUNK = 1 << 16
+
+
+def boards_to_array(boards):
+    """Convert list-of-strings boards to an N x 6 x 7 int8 array."""
+    return np.array([[[PIECE_CODES[cell] for cell in row] for row in board] for board in boards],
+                    dtype=np.int8)
+
+
+def _piece_code(piece):
+    code = PIECE_CODES.get(piece, piece)
+    if code not in (X, O):
+        raise ValueError(f"piece must be 'X', 'O', {X} or {O}, not {piece!r}")
+    return code
+
+
+def _flat(boards):
+    boards = np.asarray(boards, dtype=np.int8)
+    if boards.ndim == 2:
+        boards = boards[np.newaxis]
+    if boards.shape[1:] != (ROW_COUNT, COLUMN_COUNT):
+        raise ValueError(f"expected boards of shape (N, {ROW_COUNT}, {COLUMN_COUNT}), got {boards.shape}")
+    return boards.reshape(len(boards), ROW_COUNT * COLUMN_COUNT)
+
+
+def score_positions_batch(boards, piece="O"):
+    """
+    score_position(board, piece) for every board. Returns an int32 array
+    of length N.
+    """
+    flat = _flat(boards)
+    me = _piece_code(piece)
+    opp = O if me == X else X
+
+    scores = np.empty(len(flat), dtype=np.int32)
+    for start in range(0, len(flat), CHUNK):
+        chunk = flat[start:start + CHUNK]
+        mine = chunk == me
+        weights = mine.astype(np.int8) + (chunk == opp).astype(np.int8) * _BASE
+        codes = weights[:, LINE_INDEX].sum(axis=2, dtype=np.int16)
+        scores[start:start + CHUNK] = (
+            WINDOW_SCORE[codes].sum(axis=1)
+            + CENTER_WEIGHT * mine[:, CENTER_INDEX].sum(axis=1)
+        )
+    return scores
+
+
+def winning_move_batch(boards, piece):
+    """winning_move(board, piece) for every board. Returns a bool array."""
+    flat = _flat(boards)
+    me = _piece_code(piece)
+
+    result = np.empty(len(flat), dtype=bool)
+    for start in range(0, len(flat), CHUNK):
+        mine = flat[start:start + CHUNK] == me
+        result[start:start + CHUNK] = mine[:, LINE_INDEX].all(axis=2).any(axis=1)
+    return result
@@ -0,0 +1,262 @@
+"""
+Reproducible speed benchmark for the AI levels (no pygame needed).
+
+Runs every level on a fixed corpus of early-, mid- and late-game positions
+with the settings Connect4Game.get_ai_move uses (opening book excluded) and
+reports time-to-move percentiles, node counts, nodes/second and peak memory.
+Save the results as JSON and compare two runs to catch regressions:
+
+    python benchmark.py --out before.json
+    ... change something ...
+    python benchmark.py --out after.json --compare before.json
+
+With --compare the exit status is 1 when a level's median time-to-move got
+slower than --max-slowdown allows, so a release script can gate on it.
+A level is a name with an optional depth, as in arena.py (e.g. "ab:6").
+For mcts the node count is the number of playouts, so nodes/s is playouts/s.
+"""
+
+import argparse
+import json
+import math
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+
+from connect4 import create_board, get_next_open_row, drop_piece
+from ai import ai_random_move, ai_greedy_move, ai_minimax_move, ai_minimax_ab_move
+from transposition import TranspositionTable
+from solver import Solver
+from stats import SearchStats
+from mcts import MCTS, ai_mcts_move
+from arena import LEVELS, parse_player
+
+# Positions as the columns played so far ("X" moves first). Every one has
+# "O" to move, like the AI in the game. The last two late positions are
+# within the solver's reach (20 or fewer empty cells).
+CORPUS = {
+    "early": ["3", "633", "33406"],
+    "mid": ["433314521", "2145332322443", "33211353305402251"],
+    "late": ["131345433461655340541", "33644334434304122252611",
+             "3004334553443455354511106"],
+}
+
+# Medians below this are timer noise and never fail --compare
+MIN_GATED_SECONDS = 0.001
+
+
+def board_from_moves(moves):
+    board = create_board()
+    piece = "X"
+    for ch in moves:
+        col = int(ch)
+        drop_piece(board, get_next_open_row(board, col), col, piece)
+        piece = "O" if piece == "X" else "X"
+    return board
+
+
+def new_tables(name):
+    """Per-game search state (see Connect4Game.reset_game)."""
+    if name == "ab":
+        return TranspositionTable(), Solver()
+    if name == "mcts":
+        return MCTS()
+    return None
+
+
+def play_move(name, depth, board, rng, tables):
+    """
+    One move at this level, as get_ai_move would make it. Returns the
+    number of nodes searched (solver nodes included; playouts for mcts),
+    or None for levels that don't search.
+    """
+    if name == "random":
+        ai_random_move(board, rng)
+        return None
+    if name == "greedy":
+        ai_greedy_move(board, "O", rng)
+        return None
+
+    stats = SearchStats()
+    if name == "minimax":
+        ai_minimax_move(board, "O", depth=depth, rng=rng, stats=stats)
+    elif name == "mcts":
+        ai_mcts_move(board, "O", playouts=depth, mcts=tables, rng=rng, stats=stats)
+        return stats.playouts
+    else:
+        tt, solver = tables
+        ai_minimax_ab_move(board, "O", depth=depth, tt=tt, solver=solver, rng=rng, stats=stats)
+    return stats.nodes + stats.solver_nodes
+
+
+def percentile(samples, p):
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(samples)
+    index = max(0, math.ceil(p / 100 * len(ordered)) - 1)
+    return ordered[index]
+
+
+def bench_level(spec, repeats, seed):
+    """Time every corpus position repeats times, then measure peak memory once."""
+    name, depth = parse_player(spec)
+    latencies = []
+    nodes = None
+    node_seconds = 0.0
+    phases = {}
+
+    for phase, positions in CORPUS.items():
+        phase_latencies = []
+        phase_nodes = None
+        for moves in positions:
+            board = board_from_moves(moves)
+            for _ in range(repeats):
+                rng = random.Random(seed)
+                tables = new_tables(name)
+                started = time.perf_counter()
+                count = play_move(name, depth, board, rng, tables)
+                elapsed = time.perf_counter() - started
+
+                phase_latencies.append(elapsed)
+                if count is not None:
+                    phase_nodes = (phase_nodes or 0) + count
+                    node_seconds += elapsed
+        latencies += phase_latencies
+        if phase_nodes is not None:
+            # Seeded runs are deterministic: report the nodes of one pass
+            phase_nodes //= repeats
+            nodes = (nodes or 0) + phase_nodes
+        phases[phase] = {"p50": percentile(phase_latencies, 50), "nodes": phase_nodes}
+
+    # Separate pass: tracemalloc slows Python down too much to time under it
+    peak = 0
+    for positions in CORPUS.values():
+        for moves in positions:
+            board = board_from_moves(moves)
+            tracemalloc.start()
+            play_move(name, depth, board, random.Random(seed), new_tables(name))
+            peak = max(peak, tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+
+    return {
+        "level": name,
+        "depth": depth,
+        "moves": len(latencies),
+        "p50": percentile(latencies, 50),
+        "p90": percentile(latencies, 90),
+        "p99": percentile(latencies, 99),
+        "max": max(latencies),
+        "total_seconds": sum(latencies),
+        "nodes": nodes,
+        "nodes_per_second": nodes * repeats / node_seconds if nodes and node_seconds else None,
+        "peak_memory_bytes": peak,
+        "phases": phases,
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmark(levels, repeats=5, seed=0, verbose=True):
+    results = {}
+    for spec in levels:
+        if verbose:
+            print(f"benchmarking {spec} ...", flush=True)
+        results[spec] = bench_level(spec, repeats, seed)
+    return {
+        "meta": {
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "machine": platform.machine(),
+            "platform": platform.platform(),
+            "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "repeats": repeats,
+            "seed": seed,
+        },
+        "results": results,
+    }
+
+
+# REPORTING
+def _ms(seconds):
+    return f"{seconds * 1000:.2f}"
+
+
+def _count(value):
+    return "n/a" if value is None else f"{value:,.0f}"
+
+
+def print_report(report):
+    print(f"\n{'level':<12}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'nodes':>12}"
+          f"{'nodes/s':>12}{'peak KiB':>10}")
+    for spec, row in report["results"].items():
+        print(f"{spec:<12}{_ms(row['p50']):>10}{_ms(row['p90']):>10}{_ms(row['p99']):>10}"
+              f"{_count(row['nodes']):>12}{_count(row['nodes_per_second']):>12}"
+              f"{row['peak_memory_bytes'] / 1024:>10.0f}")
+
+
+def compare(old, new, max_slowdown):
+    """Print old vs new per level. Returns the levels that regressed."""
+    regressions = []
+    print(f"\nvs {old['meta'].get('commit') or 'baseline'}:")
+    print(f"{'level':<12}{'p50 ms':>20}{'change':>9}{'nodes':>26}{'nodes/s':>26}")
+    for spec, row in new["results"].items():
+        before = old["results"].get(spec)
+        if before is None:
+            continue
+        ratio = row["p50"] / before["p50"] if before["p50"] else 1.0
+        print(f"{spec:<12}{_ms(before['p50']) + ' -> ' + _ms(row['p50']):>20}{ratio - 1:>+9.1%}"
+              f"{_count(before['nodes']) + ' -> ' + _count(row['nodes']):>26}"
+              f"{_count(before['nodes_per_second']) + ' -> ' + _count(row['nodes_per_second']):>26}")
+        if ratio > 1 + max_slowdown and before["p50"] >= MIN_GATED_SECONDS:
+            regressions.append(spec)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the AI levels on a fixed set of positions.")
+    parser.add_argument("--levels", nargs="+", default=list(LEVELS),
+                        help="levels to run, optionally with a depth (e.g. ab:6)")
+    parser.add_argument("--repeats", type=int, default=5, help="timed runs per position")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the AIs' tie-breaking")
+    parser.add_argument("--out", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="JSON file from an earlier run to compare against")
+    parser.add_argument("--max-slowdown", type=float, default=0.10,
+                        help="allowed median slowdown per level with --compare (default 0.10 = 10%%)")
+    args = parser.parse_args()
+
+    if args.repeats < 1:
+        parser.error("--repeats must be at least 1")
+    levels = list(dict.fromkeys(args.levels))
+    try:
+        for spec in levels:
+            parse_player(spec)
+    except ValueError as e:
+        parser.error(str(e))
+
+    report = run_benchmark(levels, args.repeats, args.seed)
+    print_report(report)
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            old = json.load(f)
+        regressions = compare(old, report, args.max_slowdown)
+        if regressions:
+            print(f"\nSlower than allowed ({args.max_slowdown:.0%}): {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
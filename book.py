@@ -0,0 +1,168 @@
+"""
+Opening book: precomputed best moves for the first few plies.
+
+The book is a sorted binary file of fixed-size records
+    key (uint64) | score (int32) | best column (uint8) | 3 pad bytes
+behind a 16-byte header, where key is Position.canonical_key() and score is
+from the point of view of the player to move. A position and its mirror
+image share one record (stored for whichever has the smaller key), which
+halves the book; lookup() reflects the column back for the other one.
+Books built before that also work: they hold both images, and the lookup
+simply finds the canonical one. OpeningBook maps the file with mmap and
+binary-searches it in place, so the file is never read into memory and every
+game process on the host shares the same page cache.
+
+Build a book offline with:
+    python book.py --plies 4 --depth 7 --out opening_book.bin
+"""
+
+import argparse
+import mmap
+import os
+import struct
+import time
+
+from connect4 import Position, ROW_COUNT, COLUMN_COUNT
+from ai import minimax_alpha_beta
+from transposition import TranspositionTable
+
+MAGIC = b"C4BOOK1\0"
+HEADER = struct.Struct("<8sIB3x")    # magic, record count, plies
+RECORD = struct.Struct("<QiB3x")     # key, score, best column
+KEY = struct.Struct("<Q")
+
+DEFAULT_BOOK_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "opening_book.bin")
+
+
+class OpeningBook:
+    """Read-only, memory-mapped opening book."""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError(f"{path} is empty, not an opening book")
+
+        magic, self.count, self.plies = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or len(self._map) != HEADER.size + self.count * RECORD.size:
+            self.close()
+            raise ValueError(f"{path} is not a valid opening book")
+
+    @classmethod
+    def open_if_exists(cls, path=DEFAULT_BOOK_PATH):
+        """Return an OpeningBook, or None if there is no book at path."""
+        if not os.path.exists(path):
+            return None
+        return cls(path)
+
+    def probe(self, key):
+        """Return (best_col, score) for a Position key, or None."""
+        lo, hi = 0, self.count - 1
+        while lo <= hi:
+            mid = (lo + hi) // 2
+            offset = HEADER.size + mid * RECORD.size
+            mid_key = KEY.unpack_from(self._map, offset)[0]
+            if mid_key < key:
+                lo = mid + 1
+            elif mid_key > key:
+                hi = mid - 1
+            else:
+                _, score, col = RECORD.unpack_from(self._map, offset)
+                return col, score
+        return None
+
+    def lookup(self, board, piece):
+        """Best column for piece to move on a list-of-strings board, or None."""
+        position = Position.from_board(board, piece)
+        if position.moves > self.plies:
+            return None
+        key, flipped = position.canonical_key()
+        hit = self.probe(key)
+        if hit is None:
+            return None
+        col = hit[0]
+        return COLUMN_COUNT - 1 - col if flipped else col
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+    def __len__(self):
+        return self.count
+
+
+# BUILDING A BOOK (offline)
+def enumerate_positions(plies):
+    """
+    Every non-terminal position reachable in at most plies moves, one of
+    each mirrored pair (the one whose key() is its canonical key).
+    """
+    seen = {}
+    frontier = [Position()]
+    for _ in range(plies + 1):
+        next_frontier = []
+        for position in frontier:
+            key, flipped = position.canonical_key()
+            if key in seen:
+                continue
+            if flipped:
+                position = position.mirror()
+            seen[key] = position
+            for col in range(COLUMN_COUNT):
+                if position.can_play(col) and not position.is_winning_move(col):
+                    child = position.copy()
+                    child.play(col)
+                    next_frontier.append(child)
+        frontier = next_frontier
+    return list(seen.values())
+
+
+def build_book(path, plies, depth, verbose=True):
+    """Deep-search every position up to plies and write the sorted book file."""
+    positions = enumerate_positions(plies)
+    records = []
+    started = time.perf_counter()
+
+    for i, position in enumerate(positions):
+        piece = position.piece_to_move()
+        board = position.to_board()
+        tt = TranspositionTable()
+        col, score = minimax_alpha_beta(board, depth, -999999, 999999, True, piece, tt)
+        records.append((position.key(), score, col))
+
+        if verbose and (i + 1) % 100 == 0:
+            elapsed = time.perf_counter() - started
+            print(f"{i + 1}/{len(positions)} positions searched ({elapsed:.0f}s)")
+
+    records.sort()
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, len(records), plies))
+        for key, score, col in records:
+            f.write(RECORD.pack(key, score, col))
+    os.replace(tmp_path, path)
+
+    if verbose:
+        print(f"Wrote {len(records)} positions to {path}")
+    return len(records)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the Connect 4 opening book.")
+    parser.add_argument("--plies", type=int, default=4,
+                        help="include every position up to this many moves (default 4)")
+    parser.add_argument("--depth", type=int, default=7,
+                        help="alpha-beta depth used to pick each move (default 7)")
+    parser.add_argument("--out", default=DEFAULT_BOOK_PATH, help="output file")
+    args = parser.parse_args()
+
+    if args.plies >= ROW_COUNT * COLUMN_COUNT:
+        parser.error("plies must be smaller than the number of cells")
+    build_book(args.out, args.plies, args.depth)
+
+
+if __name__ == "__main__":
+    main()
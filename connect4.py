@@ -1,21 +1,154 @@
+from functools import lru_cache
+
 ROW_COUNT = 6
 COLUMN_COUNT = 7
+CONNECT = 4
+
+
+# BOARD GEOMETRY
+class BoardSpec:
+    """
+    Board size and win length, plus the tables derived from them:
+
+    lines         - every window of `connect` cells that can win, as (row, col) tuples
+    lines_through - lines_through[r][c] lists the indices of the lines using that cell
+    center_weight - center_weight[r][c] is 1 in the center column, 0 elsewhere
+    bits_per_column, bottom_mask, top_mask, column_mask, board_mask,
+    bottom_row, shifts, run_shifts, cell_bits - bitboard constants (see the
+    BITBOARD section)
+
+    Get specs from board_spec(), which builds each geometry once and caches
+    it. Functions that take spec=None use the standard 6 x 7 connect-4.
+    """
+
+    def __init__(self, rows=ROW_COUNT, cols=COLUMN_COUNT, connect=CONNECT):
+        if rows < 1 or cols < 1:
+            raise ValueError(f"board must have at least one row and column, not {rows} x {cols}")
+        if not 2 <= connect <= max(rows, cols):
+            raise ValueError(f"cannot connect {connect} on a {rows} x {cols} board")
+        self.rows = rows
+        self.cols = cols
+        self.connect = connect
+        self.cells = rows * cols
+        self.center = cols // 2
+
+        lines = []
+        for r in range(rows):
+            for c in range(cols - connect + 1):
+                lines.append(tuple((r, c + i) for i in range(connect)))       # horizontal
+        for c in range(cols):
+            for r in range(rows - connect + 1):
+                lines.append(tuple((r + i, c) for i in range(connect)))       # vertical
+        for r in range(rows - connect + 1):
+            for c in range(cols - connect + 1):
+                lines.append(tuple((r + i, c + i) for i in range(connect)))   # positive diagonal
+        for r in range(connect - 1, rows):
+            for c in range(cols - connect + 1):
+                lines.append(tuple((r - i, c + i) for i in range(connect)))   # negative diagonal
+        self.lines = tuple(lines)
+
+        self.lines_through = [[[] for _ in range(cols)] for _ in range(rows)]
+        for index, line in enumerate(lines):
+            for r, c in line:
+                self.lines_through[r][c].append(index)
+        self.center_weight = [[1 if c == self.center else 0 for c in range(cols)]
+                              for _ in range(rows)]
+
+        h = rows + 1
+        self.bits_per_column = h
+        self.bottom_mask = [1 << (c * h) for c in range(cols)]
+        self.top_mask = [1 << (rows - 1 + c * h) for c in range(cols)]
+        self.column_mask = [((1 << rows) - 1) << (c * h) for c in range(cols)]
+        self.board_mask = sum(self.column_mask)
+        self.bottom_row = sum(self.bottom_mask)
+        # cell_bits[row][col]: bit of board[row][col] (row 0 is the top row)
+        self.cell_bits = [[1 << (c * h + rows - 1 - r) for c in range(cols)] for r in range(rows)]
+        # vertical, horizontal and the two diagonals
+        self.shifts = (1, h, h - 1, h + 1)
+        # alignment() grows runs by doubling (1, 2, 4, ... up to connect),
+        # so connect 4 takes two steps per direction
+        steps = []
+        length = 1
+        while length < connect:
+            step = min(length, connect - length)
+            steps.append(step)
+            length += step
+        self.run_shifts = tuple(tuple(shift * step for step in steps) for shift in self.shifts)
+
+    def __repr__(self):
+        return f"board_spec({self.rows}, {self.cols}, {self.connect})"
+
+    def __eq__(self, other):
+        return (isinstance(other, BoardSpec)
+                and (self.rows, self.cols, self.connect) == (other.rows, other.cols, other.connect))
+
+    def __hash__(self):
+        return hash((self.rows, self.cols, self.connect))
+
+    def __reduce__(self):
+        # Unpickle (e.g. in a worker process) through the cache
+        return board_spec, (self.rows, self.cols, self.connect)
+
+    def cell_bit(self, row, col):
+        """Bit for board[row][col] (row 0 is the top row)."""
+        return self.cell_bits[row][col]
+
+    def alignment(self, bits):
+        """True if the bitboard holds `connect` in a row in any direction."""
+        for shifts in self.run_shifts:
+            run = bits
+            for shift in shifts:
+                run &= run >> shift
+            if run:
+                return True
+        return False
+
+    def winning_cells(self, bits, mask):
+        """
+        Empty cells (not necessarily playable yet) that would complete
+        `connect` in a row for the stones in bits. mask is every occupied cell.
+        """
+        if self.connect == 4:
+            return winning_cells(bits, mask, self.bits_per_column, self.board_mask)
+        connect = self.connect
+        cells = 0
+        for shift in self.shifts:
+            # runs[n]: cells starting n stones in a row in this direction
+            runs = [-1, bits]
+            for n in range(2, connect):
+                runs.append(runs[-1] & (bits >> ((n - 1) * shift)))
+            # the empty cell with `before` stones behind it and the rest ahead
+            for before in range(connect):
+                ahead = runs[connect - 1 - before] >> shift
+                cells |= (runs[before] << (before * shift)) & ahead
+        return cells & (self.board_mask ^ mask)
+
+
+@lru_cache(maxsize=None)
+def board_spec(rows=ROW_COUNT, cols=COLUMN_COUNT, connect=CONNECT):
+    """The (cached) BoardSpec for this geometry."""
+    return BoardSpec(rows, cols, connect)
+
+
+DEFAULT_SPEC = board_spec()
 
-def create_board():
-    board = [[" " for _ in range(COLUMN_COUNT)] for _ in range(ROW_COUNT)]
+
+def create_board(spec=None):
+    spec = spec or DEFAULT_SPEC
+    board = [[" " for _ in range(spec.cols)] for _ in range(spec.rows)]
     return board
 
 def print_board(board):
     # Print from top row down
     for row in board:
         print("| " + " | ".join(row) + " |")
-    print("  " + "   ".join(str(i) for i in range(COLUMN_COUNT)))
+    print("  " + "   ".join(str(i) for i in range(len(board[0]))))
 
 def is_valid_location(board, col):
     return board[0][col] == " "
 
 def get_next_open_row(board, col):
-    for r in range(ROW_COUNT - 1, -1, -1):
+    for r in range(len(board) - 1, -1, -1):
         if board[r][col] == " ":
             return r
     return None
@@ -23,29 +156,299 @@ def get_next_open_row(board, col):
 def drop_piece(board, row, col, piece):
     board[row][col] = piece
 
-def winning_move(board, piece):
-    # Check horizontal
-    for r in range(ROW_COUNT):
-        for c in range(COLUMN_COUNT - 3):
-            if all(board[r][c+i] == piece for i in range(4)):
-                return True
+def is_symmetric(board):
+    """True if the board is its own mirror image (left to right)."""
+    return all(row == row[::-1] for row in board)
 
-    # Check vertical
-    for c in range(COLUMN_COUNT):
-        for r in range(ROW_COUNT - 3):
-            if all(board[r+i][c] == piece for i in range(4)):
-                return True
+def mirror_board(board):
+    """New board reflected left to right."""
+    return [row[::-1] for row in board]
 
-    # Check positive diagonal
-    for r in range(ROW_COUNT - 3):
-        for c in range(COLUMN_COUNT - 3):
-            if all(board[r+i][c+i] == piece for i in range(4)):
-                return True
+def winning_move(board, piece, spec=None):
+    """Scan every line of the board (see winning_move_at for the fast check)."""
+    spec = spec or DEFAULT_SPEC
+    for line in spec.lines:
+        if all(board[r][c] == piece for r, c in line):
+            return True
+    return False
 
-    # Check negative diagonal
-    for r in range(3, ROW_COUNT):
-        for c in range(COLUMN_COUNT - 3):
-            if all(board[r-i][c+i] == piece for i in range(4)):
-                return True
+def winning_move_at(board, row, col, piece, spec=None):
+    """
+    Check only the four lines through the disc just dropped at (row, col).
+    Much cheaper than winning_move, which rescans the whole board.
+    """
+    spec = spec or DEFAULT_SPEC
+    rows, cols, connect = spec.rows, spec.cols, spec.connect
+    for dr, dc in ((0, 1), (1, 0), (1, 1), (1, -1)):
+        count = 1
+
+        r, c = row + dr, col + dc
+        while 0 <= r < rows and 0 <= c < cols and board[r][c] == piece:
+            count += 1
+            r += dr
+            c += dc
+
+        r, c = row - dr, col - dc
+        while 0 <= r < rows and 0 <= c < cols and board[r][c] == piece:
+            count += 1
+            r -= dr
+            c -= dc
+
+        if count >= connect:
+            return True
+
+    return False
+
+
+# MAKE / UNMAKE
+class GameState:
+    """
+    A board that the search changes in place instead of copying.
+
+    board   - the usual list-of-strings board (row 0 is the top)
+    heights - next open row for every column, -1 when the column is full
+    moves   - stack of (row, col, piece) so undo() can take the last disc back
+    spec    - the BoardSpec the board follows
+    bits    - bitboard of each piece's discs and mask of every disc (the
+              layout of spec.cell_bits), kept in step for threats.py
+
+    The board is copied once when the state is created, so the caller's
+    board is never touched.
+    """
+
+    __slots__ = ("board", "heights", "moves", "spec", "columns", "bits", "mask", "cell_bits")
+
+    def __init__(self, board=None, spec=None):
+        self.spec = spec or DEFAULT_SPEC
+        self.board = create_board(self.spec) if board is None else [row[:] for row in board]
+        self.columns = range(self.spec.cols)
+        self.heights = [get_next_open_row(self.board, c) for c in self.columns]
+        self.heights = [-1 if h is None else h for h in self.heights]
+        self.moves = []
+        self.cell_bits = self.spec.cell_bits
+        self.bits = {"X": 0, "O": 0}
+        self.mask = 0
+        for r, row in enumerate(self.board):
+            for c, piece in enumerate(row):
+                if piece != " ":
+                    self.bits[piece] |= self.cell_bits[r][c]
+                    self.mask |= self.cell_bits[r][c]
+
+    def can_play(self, col):
+        return self.heights[col] >= 0
+
+    def valid_locations(self):
+        heights = self.heights
+        return [c for c in self.columns if heights[c] >= 0]
 
+    def play(self, col, piece):
+        """Drop piece into col and return the row it landed in."""
+        row = self.heights[col]
+        self.board[row][col] = piece
+        self.heights[col] = row - 1
+        self.moves.append((row, col, piece))
+        bit = self.cell_bits[row][col]
+        self.bits[piece] |= bit
+        self.mask |= bit
+        return row
+
+    def undo(self):
+        """Take back the last disc. Returns its (row, col, piece)."""
+        row, col, piece = self.moves.pop()
+        self.board[row][col] = " "
+        self.heights[col] = row
+        bit = self.cell_bits[row][col]
+        self.bits[piece] ^= bit
+        self.mask ^= bit
+        return row, col, piece
+
+    def is_winning(self, row, col, piece):
+        return winning_move_at(self.board, row, col, piece, self.spec)
+
+
+# BITBOARD POSITION
+# Each column takes ROW_COUNT + 1 bits; the extra bit on top of every column
+# stays empty so the shift-based alignment check never wraps between columns.
+# Bit 0 of a column is the BOTTOM row (board[ROW_COUNT - 1]).
+# Position and the solver are written for the standard board; BoardSpec
+# carries the same constants for other geometries.
+BITS_PER_COLUMN = DEFAULT_SPEC.bits_per_column
+
+BOTTOM_MASK = DEFAULT_SPEC.bottom_mask
+TOP_MASK = DEFAULT_SPEC.top_mask
+COLUMN_MASK = DEFAULT_SPEC.column_mask
+BOARD_MASK = DEFAULT_SPEC.board_mask
+BOTTOM_ROW = DEFAULT_SPEC.bottom_row
+
+
+def alignment(bits):
+    """Return True if the bitboard holds four in a row in any direction."""
+    # vertical, horizontal, and the two diagonals
+    for shift in (1, BITS_PER_COLUMN, BITS_PER_COLUMN - 1, BITS_PER_COLUMN + 1):
+        pairs = bits & (bits >> shift)
+        if pairs & (pairs >> (2 * shift)):
+            return True
     return False
+
+
+def winning_cells(bits, mask, h=BITS_PER_COLUMN, board_mask=BOARD_MASK):
+    """
+    Empty cells (not necessarily playable yet) that would complete four in
+    a row for the stones in bits. mask is every occupied cell. h and
+    board_mask default to the standard board (see BoardSpec.winning_cells).
+    """
+    h2 = 2 * h
+
+    # vertical: three stones directly below
+    cells = (bits << 1) & (bits << 2) & (bits << 3)
+
+    # horizontal
+    pair = (bits << h) & (bits << h2)
+    cells |= pair & ((bits << 3 * h) | (bits >> h))
+    pair = (bits >> h) & (bits >> h2)
+    cells |= pair & ((bits << h) | (bits >> 3 * h))
+
+    # diagonal going down to the right
+    pair = (bits << (h - 1)) & (bits << (h2 - 2))
+    cells |= pair & ((bits << (3 * h - 3)) | (bits >> (h - 1)))
+    pair = (bits >> (h - 1)) & (bits >> (h2 - 2))
+    cells |= pair & ((bits << (h - 1)) | (bits >> (3 * h - 3)))
+
+    # diagonal going up to the right
+    pair = (bits << (h + 1)) & (bits << (h2 + 2))
+    cells |= pair & ((bits << (3 * h + 3)) | (bits >> (h + 1)))
+    pair = (bits >> (h + 1)) & (bits >> (h2 + 2))
+    cells |= pair & ((bits << (h + 1)) | (bits >> (3 * h + 3)))
+
+    return cells & (board_mask ^ mask)
+
+
+def cell_bit(row, col):
+    """Bit for board[row][col] (row 0 is the top row, like the list board)."""
+    return 1 << (col * BITS_PER_COLUMN + (ROW_COUNT - 1 - row))
+
+
+def mirror_bits(bits):
+    """The bitboard reflected left to right (column c becomes COLUMN_COUNT - 1 - c)."""
+    column = (1 << BITS_PER_COLUMN) - 1
+    mirrored = 0
+    for c in range(COLUMN_COUNT):
+        mirrored |= ((bits >> (c * BITS_PER_COLUMN)) & column) << ((COLUMN_COUNT - 1 - c) * BITS_PER_COLUMN)
+    return mirrored
+
+
+class Position:
+    """
+    Compact Connect 4 position stored as two bitboards.
+
+    current - stones of the player whose turn it is
+    mask    - every occupied cell
+    moves   - number of stones played so far
+
+    "X" always moves first, so the player to move is "X" when moves is even.
+    """
+
+    __slots__ = ("current", "mask", "moves")
+
+    def __init__(self, current=0, mask=0, moves=0):
+        self.current = current
+        self.mask = mask
+        self.moves = moves
+
+    def copy(self):
+        return Position(self.current, self.mask, self.moves)
+
+    def can_play(self, col):
+        """True if the column still has room."""
+        return (self.mask & TOP_MASK[col]) == 0
+
+    def play(self, col):
+        """Drop a stone for the player to move. Column must be playable."""
+        self.current ^= self.mask
+        self.mask |= self.mask + BOTTOM_MASK[col]
+        self.moves += 1
+
+    def play_sequence(self, cols):
+        """Play a string or iterable of columns, e.g. "3344". Returns self."""
+        for col in cols:
+            self.play(int(col))
+        return self
+
+    def is_winning_move(self, col):
+        """True if the player to move wins by playing in col."""
+        bits = self.current | ((self.mask + BOTTOM_MASK[col]) & COLUMN_MASK[col])
+        return alignment(bits)
+
+    def last_player_won(self):
+        """True if the player who just moved has four in a row."""
+        return alignment(self.current ^ self.mask)
+
+    def possible(self):
+        """Bitmap of the cells a stone can be dropped into right now."""
+        return (self.mask + BOTTOM_ROW) & BOARD_MASK
+
+    def is_full(self):
+        return self.moves == ROW_COUNT * COLUMN_COUNT
+
+    def key(self):
+        """Unique integer for this position (current + mask is collision-free)."""
+        return self.current + self.mask
+
+    def mirror(self):
+        """The same position reflected left to right."""
+        return Position(mirror_bits(self.current), mirror_bits(self.mask), self.moves)
+
+    def canonical_key(self):
+        """
+        (key, flipped): the smaller of key() and the mirror image's key, so
+        both share one cache entry. flipped is True when it is the mirror's;
+        a column stored under it then maps back as COLUMN_COUNT - 1 - col.
+        """
+        key = self.key()
+        mirrored = mirror_bits(self.current) + mirror_bits(self.mask)
+        if mirrored < key:
+            return mirrored, True
+        return key, False
+
+    def piece_to_move(self):
+        return "X" if self.moves % 2 == 0 else "O"
+
+    @classmethod
+    def from_board(cls, board, piece_to_move=None):
+        """
+        Build a Position from a list-of-strings board.
+        If piece_to_move is None it is inferred from the stone counts.
+        """
+        x_bits = 0
+        o_bits = 0
+        moves = 0
+        for r in range(ROW_COUNT):
+            for c in range(COLUMN_COUNT):
+                if board[r][c] == "X":
+                    x_bits |= cell_bit(r, c)
+                    moves += 1
+                elif board[r][c] == "O":
+                    o_bits |= cell_bit(r, c)
+                    moves += 1
+
+        if piece_to_move is None:
+            piece_to_move = "X" if moves % 2 == 0 else "O"
+        current = x_bits if piece_to_move == "X" else o_bits
+        return cls(current, x_bits | o_bits, moves)
+
+    def to_board(self, piece_to_move=None):
+        """Convert back to the list-of-strings board used by main.py and GameUI."""
+        if piece_to_move is None:
+            piece_to_move = self.piece_to_move()
+        opp_piece = "O" if piece_to_move == "X" else "X"
+        other = self.current ^ self.mask
+
+        board = create_board()
+        for r in range(ROW_COUNT):
+            for c in range(COLUMN_COUNT):
+                bit = cell_bit(r, c)
+                if self.current & bit:
+                    board[r][c] = piece_to_move
+                elif other & bit:
+                    board[r][c] = opp_piece
+        return board
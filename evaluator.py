@@ -0,0 +1,156 @@
+"""
+Incremental version of ai.score_position.
+
+score_position rebuilds all 69 four-cell windows at every leaf. The
+Evaluator below uses the windows precomputed once per board geometry
+(connect4.BoardSpec), keeps how many discs of each side sit in every
+window, and updates the total score when a disc is dropped or removed -
+only the windows through that cell change. The score is always exactly
+what score_position(board, piece, spec) would return; run this module to
+check that on random games for several geometries.
+"""
+
+import random
+from functools import lru_cache
+
+from connect4 import DEFAULT_SPEC, board_spec, create_board, get_next_open_row, is_valid_location
+
+WINDOW = DEFAULT_SPEC.connect
+CENTER = DEFAULT_SPEC.center
+CENTER_WEIGHT = 3
+
+# Every window of four cells on the standard board, and the windows passing
+# through each cell
+LINES = DEFAULT_SPEC.lines
+LINES_THROUGH = DEFAULT_SPEC.lines_through
+
+
+def _window_score(mine, theirs, window=WINDOW):
+    """Same rules as ai.count_window, from counts instead of a list."""
+    empty = window - mine - theirs
+    score = 0
+    if mine == window:
+        score += 100
+    elif mine == window - 1 and empty == 1:
+        score += 5
+    elif mine == window - 2 and empty == 2:
+        score += 2
+    if theirs == window - 1 and empty == 1:
+        score -= 4
+    return score
+
+
+@lru_cache(maxsize=None)
+def line_scores(window):
+    """line_scores(window)[mine][theirs] for every possible window of that size."""
+    return [[_window_score(m, t, window) if m + t <= window else 0 for t in range(window + 1)]
+            for m in range(window + 1)]
+
+
+# LINE_SCORE[mine][theirs] for every possible window
+LINE_SCORE = line_scores(WINDOW)
+
+
+class Evaluator:
+    """
+    Running score_position(board, piece, spec) kept up to date by
+    play()/undo(). Call play() right after a disc is dropped and undo()
+    right after the same disc is removed.
+    """
+
+    __slots__ = ("piece", "mine", "theirs", "score", "lines_through", "line_score", "center")
+
+    def __init__(self, board, piece, spec=None):
+        spec = spec or DEFAULT_SPEC
+        self.piece = piece
+        self.lines_through = spec.lines_through
+        self.line_score = line_scores(spec.connect)
+        self.center = spec.center
+        self.mine = [0] * len(spec.lines)
+        self.theirs = [0] * len(spec.lines)
+        # play() only adds changes, so start from the empty board's score
+        # (non-zero when connect is 2: an empty window then scores like two of mine)
+        self.score = len(spec.lines) * self.line_score[0][0]
+
+        for r in range(spec.rows):
+            for c in range(spec.cols):
+                if board[r][c] != " ":
+                    self.play(r, c, board[r][c])
+
+    def play(self, row, col, piece):
+        mine, theirs, line_score = self.mine, self.theirs, self.line_score
+        delta = 0
+        if piece == self.piece:
+            for line in self.lines_through[row][col]:
+                m, t = mine[line], theirs[line]
+                delta += line_score[m + 1][t] - line_score[m][t]
+                mine[line] = m + 1
+            if col == self.center:
+                delta += CENTER_WEIGHT
+        else:
+            for line in self.lines_through[row][col]:
+                m, t = mine[line], theirs[line]
+                delta += line_score[m][t + 1] - line_score[m][t]
+                theirs[line] = t + 1
+        self.score += delta
+
+    def undo(self, row, col, piece):
+        mine, theirs, line_score = self.mine, self.theirs, self.line_score
+        delta = 0
+        if piece == self.piece:
+            for line in self.lines_through[row][col]:
+                m, t = mine[line], theirs[line]
+                delta += line_score[m - 1][t] - line_score[m][t]
+                mine[line] = m - 1
+            if col == self.center:
+                delta -= CENTER_WEIGHT
+        else:
+            for line in self.lines_through[row][col]:
+                m, t = mine[line], theirs[line]
+                delta += line_score[m][t - 1] - line_score[m][t]
+                theirs[line] = t - 1
+        self.score += delta
+
+
+def check(specs, games=20, seed=0):
+    """
+    Play random games on every spec and compare the running score with
+    ai.score_position after every move and undo. Returns the mismatches.
+    """
+    from ai import score_position
+
+    rng = random.Random(seed)
+    mismatches = 0
+    for spec in specs:
+        for _ in range(games):
+            board = create_board(spec)
+            evaluators = {piece: Evaluator(board, piece, spec) for piece in ("X", "O")}
+            moves = []
+            piece = "X"
+            while True:
+                valid = [c for c in range(spec.cols) if is_valid_location(board, c)]
+                if not valid:
+                    break
+                col = rng.choice(valid)
+                row = get_next_open_row(board, col)
+                board[row][col] = piece
+                moves.append((row, col, piece))
+                for evaluator in evaluators.values():
+                    evaluator.play(row, col, piece)
+                for p, evaluator in evaluators.items():
+                    mismatches += evaluator.score != score_position(board, p, spec)
+                piece = "O" if piece == "X" else "X"
+            for row, col, piece in reversed(moves):
+                board[row][col] = " "
+                for evaluator in evaluators.values():
+                    evaluator.undo(row, col, piece)
+            for p, evaluator in evaluators.items():
+                mismatches += evaluator.score != score_position(board, p, spec)
+    return mismatches
+
+
+if __name__ == "__main__":
+    geometries = [(6, 7, 4), (6, 7, 2), (5, 5, 3), (7, 9, 5), (4, 4, 2)]
+    failed = check([board_spec(*g) for g in geometries])
+    print(f"{failed} mismatches over {', '.join('%dx%d/%d' % g for g in geometries)}")
+    raise SystemExit(1 if failed else 0)
@@ -5,19 +5,71 @@ Main game controller that integrates UI, game logic, and AI.
 This module serves as the entry point and game loop controller,
 connecting the GameUI for rendering, connect4 for game rules,
 and ai module for computer opponents.
+
+GameUI (and with it pygame) is only imported when a GUI game is started,
+so the console and headless modes start quickly and work without a display:
+
+    python main.py                      # GUI
+    python main.py console              # console menu
+    python main.py headless ab:5 greedy --games 10
+    python main.py gui --rows 8 --cols 9 --connect 5   # any board size
 """
 
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+
 from connect4 import (
     create_board,
     print_board,
     is_valid_location,
     get_next_open_row,
     drop_piece,
-    winning_move,
-    COLUMN_COUNT
+    winning_move_at,
+    board_spec,
+    GameState,
+    DEFAULT_SPEC
+)
+from ai import (
+    ai_random_move,
+    ai_greedy_move,
+    ai_minimax_move,
+    ai_minimax_ab_move,
+    SearchTimeout,
+    SOLVER_EMPTY_CELLS
 )
-from ai import ai_random_move, ai_greedy_move, ai_minimax_move, ai_minimax_ab_move
-from GameUI import GameUI, RED, YELLOW, WHITE
+from transposition import TranspositionTable
+from solver import Solver, empty_cells
+from book import OpeningBook
+from stats import SearchStats
+from evaluator import Evaluator
+from mcts import MCTS, ai_mcts_move
+
+# The "AI is thinking..." indicator stays up at least this long, so instant
+# moves don't flash past
+AI_MIN_THINK_MS = 300
+# How long the game loop waits on the AI thread between event pumps
+AI_POLL_SECONDS = 1 / 30
+# Expert's Monte Carlo search budget per move (unless ai_time_limit_ms is set)
+MCTS_TIME_MS = 1000
+
+
+def likely_replies(board, piece, spec=None):
+    """Valid columns for piece, most promising first (by the greedy heuristic)."""
+    state = GameState(board, spec)
+    evaluator = Evaluator(state.board, piece, state.spec)
+    scores = {}
+    for col in state.valid_locations():
+        row = state.play(col, piece)
+        evaluator.play(row, col, piece)
+        scores[col] = evaluator.score
+        evaluator.undo(row, col, piece)
+        state.undo()
+    return sorted(scores, key=lambda c: -scores[c])
 
 
 class Connect4Game:
@@ -26,21 +78,81 @@ class Connect4Game:
     between UI, game logic, and AI components.
     """
     
-    def __init__(self):
-        self.ui = GameUI()
+    def __init__(self, ai_time_limit_ms=None, book_difficulties=(4,), ai_workers=None,
+                 parallel_mode="root", seed=None, log_search_stats=False, ponder=False,
+                 spec=None, mcts_workers=None):
+        from GameUI import GameUI  # imports pygame; only needed for the GUI
+        # Board size and win length (connect4.BoardSpec); the opening book
+        # and the parallel searchers only cover the standard board
+        self.spec = spec or DEFAULT_SPEC
+        self.ui = GameUI(self.spec)
         self.board = None
         self.game_over = False
         self.turn = 0  # 0 = Player 1 (X/Red), 1 = Player 2 or AI (O/Yellow)
         self.difficulty = 1
         self.vs_ai = True  # True for Player vs AI, False for Player vs Player
+        self.last_move = None  # (row, col) of the most recent disc
+        self.tt = None  # transposition table, kept for the whole game
+        self.solver = None  # endgame solver, also kept for the whole game
+        self.mcts = None  # Expert's search tree, reused from move to move
+        # The AI breaks ties between equally good moves with a per-game
+        # random.Random; a fixed seed makes every game reproducible
+        self.seed = seed
+        self.rng = None
+        # When set, Very Hard searches against this budget instead of depth 5
+        self.ai_time_limit_ms = ai_time_limit_ms
+        # Difficulties that play from the opening book (if one has been built)
+        self.book = OpeningBook.open_if_exists()
+        self.book_difficulties = book_difficulties
+        # Print a one-line stats.SearchStats summary after every AI search
+        # (the last one is also kept in last_stats)
+        self.log_search_stats = log_search_stats
+        self.last_stats = None
+        # The AI searches on a worker thread so the window stays responsive;
+        # setting ai_stop cancels the search in progress
+        self.ai_executor = None
+        self.ai_future = None
+        self.ai_stop = threading.Event()
+        self.ai_started = 0.0
+        # Pondering: while the human thinks, the AI thread works out its
+        # answer to each likely reply (ponder_cache maps reply column to
+        # (answer, rng state)); its searches also warm up the shared tt
+        self.ponder = ponder
+        self.ponder_cache = {}
+        self.ponder_future = None
+        self.ponder_stop = threading.Event()
+        # Worker processes for Very Hard's fixed-depth search (None = serial).
+        # The pool is created once and reused for every move.
+        # parallel_mode: "root" splits the root moves, "smp" runs Lazy SMP
+        # with a shared-memory transposition table.
+        self.searcher = None
+        if ai_workers:
+            from parallel import ParallelSearcher, LazySMPSearcher
+            if parallel_mode == "smp":
+                self.searcher = LazySMPSearcher(ai_workers)
+            else:
+                self.searcher = ParallelSearcher(ai_workers)
+        # Worker processes for Expert's root-parallel MCTS (None = serial)
+        self.mcts_searcher = None
+        if mcts_workers:
+            from mcts import RootParallelMCTS
+            self.mcts_searcher = RootParallelMCTS(mcts_workers, spec=self.spec)
         
     def reset_game(self):
         """Reset game state for a new game."""
-        self.board = create_board()
+        self.board = create_board(self.spec)
         self.game_over = False
         self.turn = 0
+        self.last_move = None
+        self.tt = TranspositionTable()
+        self.solver = Solver()
+        self.mcts = MCTS(spec=self.spec)
+        self.rng = random.Random(self.seed)
+        self.ponder_cache = {}
+        if hasattr(self.searcher, "new_game"):  # LazySMPSearcher's shared table
+            self.searcher.new_game()
     
-    def get_ai_move(self):
+    def get_ai_move(self, stop=None, board=None, rng=None):
         """
         Get AI move based on selected difficulty.
         
@@ -48,20 +160,173 @@ class Connect4Game:
             1 - Easy: Random moves
             2 - Normal: Greedy heuristic evaluation
             3 - Hard: Minimax without alpha-beta (depth 4)
-            4 - Very Hard: Minimax with alpha-beta pruning (depth 5)
+            4 - Very Hard: Minimax with alpha-beta pruning (depth 5, or
+                iterative deepening within ai_time_limit_ms when it is set),
+                switching to the exact solver near the end of the game
+            5 - Expert: Monte Carlo tree search for MCTS_TIME_MS (or
+                ai_time_limit_ms), keeping its tree between moves
+
+        Difficulties listed in book_difficulties play from the opening
+        book while the position is in it.
+
+        Setting stop (a threading.Event) from another thread cancels the
+        minimax searches with ai.SearchTimeout.
+
+        board and rng default to the game's own; pondering passes a copy of
+        the board with a possible reply played (and no stats are logged).
         """
+        pondering = board is not None
+        if board is None:
+            board = self.board
+        if rng is None:
+            rng = self.rng
+
+        standard = self.spec == DEFAULT_SPEC
+        if standard and self.book is not None and self.difficulty in self.book_difficulties:
+            col = self.book.lookup(board, "O")
+            if col is not None:
+                return col
+        
         if self.difficulty == 1:
-            return ai_random_move(self.board)
+            return ai_random_move(board, rng)
         elif self.difficulty == 2:
-            return ai_greedy_move(self.board, "O")
-        elif self.difficulty == 3:
-            return ai_minimax_move(self.board, "O", depth=4)
+            return ai_greedy_move(board, "O", rng, spec=self.spec)
+
+        stats = SearchStats() if self.log_search_stats and not pondering else None
+        if self.difficulty == 3:
+            col = ai_minimax_move(board, "O", depth=4, rng=rng, stats=stats, stop=stop,
+                                  spec=self.spec)
+        elif self.difficulty == 5:
+            time_limit_ms = self.ai_time_limit_ms or MCTS_TIME_MS
+            if self.mcts_searcher is not None:
+                col = self.mcts_searcher.best_move(board, "O", time_limit_ms=time_limit_ms,
+                                                   rng=rng, stats=stats)
+            else:
+                col = ai_mcts_move(board, "O", time_limit_ms=time_limit_ms, mcts=self.mcts,
+                                   rng=rng, stats=stats, stop=stop)
         else:  # difficulty == 4
-            return ai_minimax_ab_move(self.board, "O", depth=5)
+            if (standard and self.searcher is not None and self.ai_time_limit_ms is None
+                    and empty_cells(board) > SOLVER_EMPTY_CELLS):
+                return self.searcher.best_move(board, "O", depth=5)
+            col = ai_minimax_ab_move(board, "O", depth=5, tt=self.tt,
+                                     time_limit_ms=self.ai_time_limit_ms,
+                                     solver=self.solver, rng=rng, stats=stats, stop=stop,
+                                     spec=self.spec)
+
+        if stats is not None:
+            self.last_stats = stats
+            print(f"AI search: {stats.summary()}")
+        return col
     
+    def _executor(self):
+        if self.ai_executor is None:
+            self.ai_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ai")
+        return self.ai_executor
+
+    def start_ai_move(self):
+        """
+        Start get_ai_move on the AI thread; collect it with poll_ai_move.
+        If pondering already answered the human's last move, that answer
+        is used instead of searching again.
+        """
+        self.stop_pondering()
+        self.ai_stop.clear()
+        self.ai_started = time.perf_counter()
+
+        pondered = None
+        if self.last_move is not None:
+            pondered = self.ponder_cache.get(self.last_move[1])
+        self.ponder_cache = {}
+        if pondered is not None:
+            col, rng_state = pondered
+            self.rng.setstate(rng_state)  # as if the search had run now
+            self.ai_future = Future()
+            self.ai_future.set_result(col)
+            return
+
+        self.ai_future = self._executor().submit(self.get_ai_move, self.ai_stop)
+
+    def poll_ai_move(self, timeout):
+        """
+        Wait up to timeout seconds for the AI. Returns its column once the
+        search is done and AI_MIN_THINK_MS have passed, otherwise None.
+        """
+        until = time.perf_counter() + timeout
+        wait([self.ai_future], timeout)
+        if not self.ai_future.done():
+            return None
+
+        shown_until = self.ai_started + AI_MIN_THINK_MS / 1000
+        if time.perf_counter() < shown_until:
+            time.sleep(max(0.0, min(shown_until, until) - time.perf_counter()))
+            if time.perf_counter() < shown_until:
+                return None
+
+        col = self.ai_future.result()
+        self.ai_future = None
+        return col
+
+    def cancel_ai_move(self):
+        """Stop the AI search in progress (if any) and wait for the thread."""
+        self.stop_pondering()
+        if self.ai_future is None:
+            return
+        self.ai_stop.set()
+        try:
+            self.ai_future.result()
+        except SearchTimeout:
+            pass
+        self.ai_future = None
+
+    # PONDERING
+    def start_pondering(self):
+        """
+        Search the human's likely replies on the AI thread while they
+        think. Only for the searching difficulties, and not with a
+        parallel searcher (its pool can't be interrupted).
+        """
+        if not self.ponder or self.difficulty < 3 or self.searcher is not None:
+            return
+        if self.difficulty == 5 and self.mcts_searcher is not None:
+            return
+        self.ponder_cache = {}
+        self.ponder_stop.clear()
+        board = [row[:] for row in self.board]
+        self.ponder_future = self._executor().submit(
+            self._ponder, board, self.rng.getstate(), self.ponder_stop
+        )
+
+    def _ponder(self, board, rng_state, stop):
+        """AI thread: fill ponder_cache until every reply is done or stop is set."""
+        for reply in likely_replies(board, "X", self.spec):
+            row = get_next_open_row(board, reply)
+            drop_piece(board, row, reply, "X")
+            try:
+                if winning_move_at(board, row, reply, "X", self.spec) or empty_cells(board) == 0:
+                    continue  # the game ends; nothing to answer
+                # Every reply starts from the same rng state the real move
+                # would, so a seeded game plays the same with or without pondering
+                rng = random.Random()
+                rng.setstate(rng_state)
+                try:
+                    col = self.get_ai_move(stop, board, rng)
+                except SearchTimeout:
+                    return
+                self.ponder_cache[reply] = (col, rng.getstate())
+            finally:
+                board[row][reply] = " "
+
+    def stop_pondering(self):
+        """Cancel pondering and wait for the AI thread to let go of tt/solver."""
+        if self.ponder_future is None:
+            return
+        self.ponder_stop.set()
+        self.ponder_future.result()
+        self.ponder_future = None
+
     def check_draw(self):
         """Check if the game is a draw (board full)."""
-        return all(self.board[0][c] != " " for c in range(COLUMN_COUNT))
+        return all(cell != " " for cell in self.board[0])
     
     def make_move(self, col, piece):
         """
@@ -73,21 +338,34 @@ class Connect4Game:
         
         row = get_next_open_row(self.board, col)
         drop_piece(self.board, row, col, piece)
+        self.last_move = (row, col)
         return True
     
+    def last_move_wins(self, piece):
+        """Check for a win through the last dropped disc only."""
+        if self.last_move is None:
+            return False
+        row, col = self.last_move
+        return winning_move_at(self.board, row, col, piece, self.spec)
+    
     def run_game(self):
         """
         Main game loop for a single game.
         Handles player input, AI moves, and win/draw conditions.
         """
+        from GameUI import RED, YELLOW
+        
         self.reset_game()
         self.ui.screen.fill((0, 0, 0))
-        self.ui.draw_board(self.board)
+        self.ui.draw_board(self.board)  # full redraw once; moves update one cell
+        
+        thinking_dots = None
         
         while not self.game_over:
             event = self.ui.process_events()
             
             if event["type"] == "quit":
+                self.cancel_ai_move()
                 return "quit"
             
             # Player 1's turn (Red/X)
@@ -100,9 +378,9 @@ class Connect4Game:
                     
                     if self.make_move(col, "X"):
                         print_board(self.board)  # Console output for debugging
-                        self.ui.draw_board(self.board)
+                        self.ui.draw_piece(*self.last_move, "X")
                         
-                        if winning_move(self.board, "X"):
+                        if self.last_move_wins("X"):
                             self.ui.show_winner("Player 1 Wins!", RED)
                             self.game_over = True
                         elif self.check_draw():
@@ -114,20 +392,28 @@ class Connect4Game:
             # Player 2 or AI's turn (Yellow/O)
             else:
                 if self.vs_ai:
-                    # AI turn
-                    self.ui.show_thinking()
-                    self.ui.wait(300)  # Brief pause for visual feedback
+                    # AI turn: search on the AI thread, keep pumping events
+                    if self.ai_future is None:
+                        self.start_ai_move()
+                    
+                    col = self.poll_ai_move(AI_POLL_SECONDS)
+                    if col is None:
+                        dots = int((time.perf_counter() - self.ai_started) / 0.4) % 4
+                        if dots != thinking_dots:
+                            self.ui.show_thinking(dots)
+                            thinking_dots = dots
+                        continue
+                    thinking_dots = None
                     
-                    col = self.get_ai_move()
                     self.make_move(col, "O")
                     
                     print(f"AI chooses column {col}")
                     print_board(self.board)
                     
                     self.ui.clear_top()
-                    self.ui.draw_board(self.board)
+                    self.ui.draw_piece(*self.last_move, "O")
                     
-                    if winning_move(self.board, "O"):
+                    if self.last_move_wins("O"):
                         self.ui.show_winner("AI Wins!", YELLOW)
                         self.game_over = True
                     elif self.check_draw():
@@ -135,6 +421,7 @@ class Connect4Game:
                         self.game_over = True
                     else:
                         self.turn = 0
+                        self.start_pondering()
                 else:
                     # Player 2 turn
                     if event["type"] == "motion":
@@ -145,9 +432,9 @@ class Connect4Game:
                         
                         if self.make_move(col, "O"):
                             print_board(self.board)
-                            self.ui.draw_board(self.board)
+                            self.ui.draw_piece(*self.last_move, "O")
                             
-                            if winning_move(self.board, "O"):
+                            if self.last_move_wins("O"):
                                 self.ui.show_winner("Player 2 Wins!", YELLOW)
                                 self.game_over = True
                             elif self.check_draw():
@@ -155,8 +442,13 @@ class Connect4Game:
                                 self.game_over = True
                             else:
                                 self.turn = 0
+            
+            # Cap the frame rate instead of spinning (the AI turn waits on
+            # the AI thread instead and skips this)
+            self.ui.tick()
         
         # Wait after game ends
+        self.stop_pondering()
         self.ui.wait(3000)
         return "complete"
     
@@ -222,10 +514,11 @@ class Connect4Game:
 def player_turn_console(board, turn):
     """Console-based player turn for testing without UI."""
     piece = "X" if turn == 0 else "O"
-    col = input(f"Player {turn + 1} ({piece}), choose a column (0-6): ")
+    last = len(board[0]) - 1
+    col = input(f"Player {turn + 1} ({piece}), choose a column (0-{last}): ")
 
-    if not col.isdigit() or int(col) not in range(COLUMN_COUNT):
-        print("Invalid input. Choose a number between 0 and 6.")
+    if not col.isdigit() or int(col) > last:
+        print(f"Invalid input. Choose a number between 0 and {last}.")
         return None
 
     col = int(col)
@@ -236,24 +529,30 @@ def player_turn_console(board, turn):
     return col
 
 
-def ai_turn_console(board, ai_piece, mode):
+def ai_turn_console(board, ai_piece, mode, tt=None, rng=None, spec=None, mcts=None):
     """Console-based AI turn for testing."""
     if mode == "1":
-        col = ai_random_move(board)
+        col = ai_random_move(board, rng)
     elif mode == "2":
-        col = ai_greedy_move(board, ai_piece)
+        col = ai_greedy_move(board, ai_piece, rng, spec=spec)
     elif mode == "3":
-        col = ai_minimax_move(board, ai_piece, depth=4)
+        col = ai_minimax_move(board, ai_piece, depth=4, rng=rng, spec=spec)
+    elif mode == "5":
+        col = ai_mcts_move(board, ai_piece, time_limit_ms=MCTS_TIME_MS, mcts=mcts, rng=rng,
+                           spec=spec)
     else:
-        col = ai_minimax_ab_move(board, ai_piece, depth=5)
+        col = ai_minimax_ab_move(board, ai_piece, depth=5, tt=tt, rng=rng, spec=spec)
 
     print(f"AI chooses column {col}")
     return col
 
 
-def run_console_game(vs_ai=False, ai_mode="3"):
+def run_console_game(vs_ai=False, ai_mode="3", spec=None):
     """Run game in console mode (for testing without pygame)."""
-    board = create_board()
+    board = create_board(spec)
+    tt = TranspositionTable()
+    mcts = MCTS(spec=spec)
+    rng = random.Random()
     game_over = False
     turn = 0
 
@@ -268,7 +567,7 @@ def run_console_game(vs_ai=False, ai_mode="3"):
             piece = "X"
         else:
             if vs_ai:
-                col = ai_turn_console(board, "O", ai_mode)
+                col = ai_turn_console(board, "O", ai_mode, tt, rng, spec, mcts)
             else:
                 col = player_turn_console(board, turn)
                 if col is None:
@@ -280,7 +579,7 @@ def run_console_game(vs_ai=False, ai_mode="3"):
 
         print_board(board)
 
-        if winning_move(board, piece):
+        if winning_move_at(board, row, col, piece, spec):
             if turn == 1 and vs_ai:
                 print("AI wins!")
             else:
@@ -288,7 +587,7 @@ def run_console_game(vs_ai=False, ai_mode="3"):
             game_over = True
             break
 
-        if all(board[0][c] != " " for c in range(COLUMN_COUNT)):
+        if all(cell != " " for cell in board[0]):
             print("It's a draw!")
             game_over = True
             break
@@ -296,7 +595,7 @@ def run_console_game(vs_ai=False, ai_mode="3"):
         turn = (turn + 1) % 2
 
 
-def main_console():
+def main_console(spec=None):
     """Console-based menu for testing."""
     print("1. Player vs Player (Console)")
     print("2. Player vs AI (Console)")
@@ -304,28 +603,111 @@ def main_console():
     choice = input("Choose a mode (1/2/3): ")
 
     if choice == "1":
-        run_console_game(vs_ai=False)
+        run_console_game(vs_ai=False, spec=spec)
     elif choice == "2":
         print("\nChoose AI difficulty:")
         print("1. Easy (Random)")
         print("2. Normal (Greedy Heuristic)")
         print("3. Hard (Minimax)")
         print("4. Very Hard (Minimax + Alpha-Beta)")
-        ai_mode = input("Select (1/2/3/4): ")
-        if ai_mode not in ("1", "2", "3", "4"):
+        print("5. Expert (Monte Carlo Tree Search)")
+        ai_mode = input("Select (1/2/3/4/5): ")
+        if ai_mode not in ("1", "2", "3", "4", "5"):
             ai_mode = "4"
-        run_console_game(vs_ai=True, ai_mode=ai_mode)
+        run_console_game(vs_ai=True, ai_mode=ai_mode, spec=spec)
     else:
         # Launch GUI version
-        game = Connect4Game()
-        game.run()
+        run_gui(spec=spec)
 
 
-def main():
-    """Main entry point - launches GUI version."""
-    game = Connect4Game()
+def run_gui(**options):
+    """Start the pygame version; options are passed to Connect4Game."""
+    try:
+        game = Connect4Game(**options)
+    except ImportError as e:
+        sys.exit(f"The GUI needs pygame ({e}). Try: python main.py console")
     game.run()
 
 
+def run_headless(x_spec, o_spec, games=1, seed=0, spec=None):
+    """
+    Play AI-vs-AI games without any UI and print one JSON line per game
+    (see arena.py for tournaments across many players and processes).
+    """
+    from arena import play_game
+
+    totals = {"X": 0, "O": 0, "draw": 0}
+    for g in range(games):
+        result = play_game(x_spec, o_spec, seed + g, spec)
+        totals[result["winner"]] += 1
+        print(json.dumps(result))
+    print(f"{x_spec} (X) {totals['X']} - {totals['O']} {o_spec} (O), {totals['draw']} drawn",
+          file=sys.stderr)
+    return totals
+
+
+def add_board_arguments(parser):
+    parser.add_argument("--rows", type=int, default=6, help="board height (default 6)")
+    parser.add_argument("--cols", type=int, default=7, help="board width (default 7)")
+    parser.add_argument("--connect", type=int, default=4,
+                        help="discs in a row needed to win (default 4)")
+
+
+def main(argv=None):
+    """Main entry point - launches the GUI unless another mode is chosen."""
+    parser = argparse.ArgumentParser(description="Connect 4 - AI Challenge Edition")
+    modes = parser.add_subparsers(dest="mode")
+
+    gui = modes.add_parser("gui", help="play in a pygame window (the default)")
+    gui.add_argument("--time-limit-ms", type=int, default=None,
+                     help="Very Hard searches within this budget instead of depth 5 "
+                          f"(and Expert instead of {MCTS_TIME_MS} ms)")
+    gui.add_argument("--workers", type=int, default=None,
+                     help="processes for Very Hard's parallel search")
+    gui.add_argument("--parallel", choices=("root", "smp"), default="root",
+                     help="parallel search mode used with --workers")
+    gui.add_argument("--mcts-workers", type=int, default=None,
+                     help="processes for Expert's root-parallel MCTS")
+    gui.add_argument("--seed", type=int, default=None, help="seed for reproducible AI play")
+    gui.add_argument("--ponder", action="store_true",
+                     help="let the AI think on your time")
+    gui.add_argument("--stats", action="store_true",
+                     help="print search statistics after every AI move")
+    add_board_arguments(gui)
+
+    console = modes.add_parser("console", help="console menu (no pygame needed)")
+    add_board_arguments(console)
+
+    headless = modes.add_parser("headless", help="AI vs AI without any UI")
+    headless.add_argument("x", help='first player, e.g. "ab:5" (random, greedy, minimax, ab)')
+    headless.add_argument("o", help="second player")
+    headless.add_argument("--games", type=int, default=1)
+    headless.add_argument("--seed", type=int, default=0)
+    add_board_arguments(headless)
+
+    args = parser.parse_args(argv)
+    spec = None
+    if args.mode is not None:
+        try:
+            spec = board_spec(args.rows, args.cols, args.connect)
+        except ValueError as e:
+            parser.error(str(e))
+
+    if args.mode == "console":
+        main_console(spec)
+    elif args.mode == "headless":
+        try:
+            run_headless(args.x, args.o, args.games, args.seed, spec)
+        except ValueError as e:
+            parser.error(str(e))
+    elif args.mode == "gui":
+        run_gui(ai_time_limit_ms=args.time_limit_ms, ai_workers=args.workers,
+                parallel_mode=args.parallel, seed=args.seed,
+                log_search_stats=args.stats, ponder=args.ponder, spec=spec,
+                mcts_workers=args.mcts_workers)
+    else:
+        run_gui()
+
+
 if __name__ == "__main__":
     main()
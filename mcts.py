@@ -0,0 +1,475 @@
+"""
+Monte Carlo Tree Search (UCT).
+
+Instead of a fixed-depth search with a hand-written evaluation, MCTS plays
+many quick games to the end ("playouts") and grows a tree towards the
+moves that win most often. Each playout:
+    1. selects a path down the tree with UCB1: wins / visits plus
+       exploration * sqrt(ln(parent visits) / visits)
+    2. expands one untried move at the end of that path
+    3. finishes the game from there with a cheap rollout policy
+       ("random", or "greedy": take a win, else block one, else random)
+    4. backs the result up the path
+
+It scales with the budget rather than the board, so it keeps playing
+sensibly on big boards (see connect4.BoardSpec) and under tight time
+limits. The tree runs on bitboards: the player to move's stones and the
+occupied cells, as in connect4.Position but for any BoardSpec.
+
+Keep one MCTS per game (like a TranspositionTable): the next search starts
+from the subtree of the position actually reached, so earlier playouts
+aren't wasted. RootParallelMCTS runs independent searches on a process pool
+and adds up their root visit counts.
+
+Playouts per second depend a lot on the host; to tune the budget run e.g.
+
+    python mcts.py --time-limit-ms 1000 --rollout greedy --workers 4
+"""
+
+import argparse
+import math
+import os
+import random
+import time
+
+from connect4 import DEFAULT_SPEC, board_spec
+from ai import SearchTimeout, pick_tied
+from threats import candidate_cells
+
+# UCB1 exploration constant (sqrt(2) in theory; lower searches deeper)
+EXPLORATION = 1.4
+
+# Budget when neither playouts nor time_limit_ms is given
+DEFAULT_PLAYOUTS = 2000
+
+ROLLOUTS = ("random", "greedy")
+
+# Playouts between checks of the deadline and the stop event
+CHECK_EVERY = 32
+
+
+def board_bits(board, piece, spec=None):
+    """(stones of piece, occupied cells) of a list-of-strings board."""
+    spec = spec or DEFAULT_SPEC
+    current = mask = 0
+    for r, row in enumerate(board):
+        for c, cell in enumerate(row):
+            if cell != " ":
+                bit = spec.cell_bit(r, c)
+                mask |= bit
+                if cell == piece:
+                    current |= bit
+    return current, mask
+
+
+def open_columns(mask, spec):
+    top = spec.top_mask
+    return [c for c in range(spec.cols) if not mask & top[c]]
+
+
+def forced_column(current, mask, spec):
+    """
+    A column the player to move wins with at once, or the only one that
+    doesn't lose at once (see threats.py), or None.
+    """
+    cells, wins = candidate_cells(current, current ^ mask, mask, spec)
+    if wins:
+        cells = wins & -wins
+    elif cells & (cells - 1):
+        return None
+    return (cells.bit_length() - 1) // spec.bits_per_column
+
+
+def rollout(current, mask, spec, greedy, rng):
+    """
+    Play the game out from (current, mask). Returns 1 if the player to
+    move now wins, 0 if they lose and 0.5 for a draw.
+    """
+    bottom = spec.bottom_mask
+    column = spec.column_mask
+    top = spec.top_mask
+    run_shifts = spec.run_shifts
+    board_mask = spec.board_mask
+    bottom_row = spec.bottom_row
+    h = spec.bits_per_column
+    winning_cells = spec.winning_cells
+    cols = open_columns(mask, spec)
+    me = 1   # 1 while the starting player is to move
+
+    while cols:
+        if greedy:
+            playable = (mask + bottom_row) & board_mask
+            if winning_cells(current, mask) & playable:
+                return me
+            block = winning_cells(current ^ mask, mask) & playable
+            if block:
+                col = ((block & -block).bit_length() - 1) // h
+            else:
+                col = cols[rng.randrange(len(cols))]
+            cell = (mask + bottom[col]) & column[col]
+            current |= cell
+        else:
+            col = cols[rng.randrange(len(cols))]
+            cell = (mask + bottom[col]) & column[col]
+            current |= cell
+            for shifts in run_shifts:
+                run = current
+                for shift in shifts:
+                    run &= run >> shift
+                if run:
+                    return me
+        mask |= cell
+        current ^= mask      # the other player's stones
+        me = 1 - me
+        if mask & top[col]:
+            cols.remove(col)
+    return 0.5
+
+
+class Node:
+    """
+    One position in the tree, reached by playing move.
+    wins counts from the side of the player who made that move.
+    result is 1 (that player just won) or 0.5 (draw) for finished games.
+    """
+
+    __slots__ = ("move", "parent", "children", "untried", "visits", "wins", "result")
+
+    def __init__(self, move, parent, untried, result=None):
+        self.move = move
+        self.parent = parent
+        self.children = []
+        self.untried = untried
+        self.visits = 0
+        self.wins = 0.0
+        self.result = result
+
+
+class MCTS:
+    """
+    UCT search that keeps its tree between moves.
+
+    exploration - the UCB1 constant
+    rollout     - playout policy, "random" or "greedy"
+    batch       - playouts run from every new leaf (amortises selection
+                  and expansion over several rollouts)
+    spec        - the connect4.BoardSpec played on
+    """
+
+    def __init__(self, exploration=EXPLORATION, rollout="greedy", batch=1, spec=None):
+        if rollout not in ROLLOUTS:
+            raise ValueError(f"Unknown rollout {rollout!r}; choose from {', '.join(ROLLOUTS)}")
+        self.exploration = exploration
+        self.rollout = rollout
+        self.batch = max(1, batch)
+        self.spec = spec or DEFAULT_SPEC
+        self.root = None
+        self.root_position = None
+        self.last = {}
+
+    def new_game(self):
+        self.root = None
+        self.root_position = None
+
+    def _reuse(self, current, mask):
+        """The subtree for (current, mask) if it is the old root or two plies below it."""
+        if self.root is None:
+            return None
+        if self.root_position == (current, mask):
+            return self.root
+        old_current, old_mask = self.root_position
+        bottom = self.spec.bottom_mask
+        for child in self.root.children:
+            c_current = old_current ^ old_mask
+            c_mask = old_mask | (old_mask + bottom[child.move])
+            for grandchild in child.children:
+                g_mask = c_mask | (c_mask + bottom[grandchild.move])
+                if (c_current ^ c_mask, g_mask) == (current, mask):
+                    grandchild.parent = None
+                    return grandchild
+        return None
+
+    def search(self, board, piece, playouts=None, time_limit_ms=None, rng=None, stats=None,
+               stop=None):
+        """
+        Return the column for piece to play. The budget is playouts, or
+        time_limit_ms, or DEFAULT_PLAYOUTS when neither is given. Without
+        rng the search is seeded the same way every time. stats.score is set
+        to the win rate of the chosen move (None for a forced move).
+        """
+        spec = self.spec
+        rng = rng or random.Random(0)
+        current, mask = board_bits(board, piece, spec)
+        if playouts is None and time_limit_ms is None:
+            playouts = DEFAULT_PLAYOUTS
+        deadline = None
+        if time_limit_ms is not None:
+            deadline = time.perf_counter() + time_limit_ms / 1000
+
+        if stats is not None:
+            stats.start("mcts")
+        started = time.perf_counter()
+
+        forced = forced_column(current, mask, spec)
+        if forced is not None:
+            self.new_game()
+            self._record(0, 0, started, None, stats)
+            if stats is not None:
+                stats.score = None
+            return forced
+
+        root = self._reuse(current, mask)
+        reused = 0 if root is None else root.visits
+        if root is None:
+            root = Node(None, None, open_columns(mask, spec))
+        self.root = root
+        self.root_position = (current, mask)
+
+        done = created = 0
+        iteration = 0
+        while playouts is None or done < playouts:
+            if iteration % CHECK_EVERY == 0 and iteration:
+                if stop is not None and stop.is_set():
+                    if stats is not None:
+                        stats.stop()
+                    raise SearchTimeout
+                if deadline is not None and time.perf_counter() >= deadline:
+                    break
+            iteration += 1
+            if not root.untried and not root.children:
+                break   # nothing to play
+            created += self._playout(root, current, mask, rng)
+            done += self.batch
+
+        most = max(child.visits for child in root.children)
+        best = [child.move for child in root.children if child.visits == most]
+        best.sort(key=lambda c: abs(c - spec.center))
+        col = pick_tied(best, rng)
+        self._record(done, created, started, reused, stats)
+        if stats is not None:
+            chosen = next(child for child in root.children if child.move == col)
+            stats.score = chosen.wins / chosen.visits
+        return col
+
+    def _playout(self, root, current, mask, rng):
+        """One select-expand-rollout-backup pass. Returns the number of nodes added."""
+        spec = self.spec
+        bottom = spec.bottom_mask
+        c = self.exploration
+        node = root
+
+        # 1. selection
+        while not node.untried and node.children and node.result is None:
+            log_n = math.log(node.visits)
+            node = max(node.children,
+                       key=lambda child: child.wins / child.visits
+                       + c * math.sqrt(log_n / child.visits))
+            current ^= mask
+            mask |= mask + bottom[node.move]
+
+        # 2. expansion
+        created = 0
+        if node.result is None and node.untried:
+            col = node.untried.pop(rng.randrange(len(node.untried)))
+            mover = current | ((mask + bottom[col]) & spec.column_mask[col])
+            mask |= mask + bottom[col]
+            current = mover ^ mask
+            if spec.alignment(mover):
+                child = Node(col, node, [], 1.0)
+            elif mask == spec.board_mask:
+                child = Node(col, node, [], 0.5)
+            else:
+                child = Node(col, node, open_columns(mask, spec))
+            node.children.append(child)
+            node = child
+            created = 1
+
+        # 3. simulation, scored for the player who moved into node
+        batch = self.batch
+        if node.result is not None:
+            score = node.result * batch
+        else:
+            greedy = self.rollout == "greedy"
+            score = batch - sum(rollout(current, mask, spec, greedy, rng) for _ in range(batch))
+
+        # 4. backpropagation
+        while node is not None:
+            node.visits += batch
+            node.wins += score
+            score = batch - score
+            node = node.parent
+        return created
+
+    def _record(self, done, created, started, reused, stats):
+        elapsed = time.perf_counter() - started
+        root = self.root
+        self.last = {
+            "playouts": done,
+            "seconds": elapsed,
+            "playouts_per_second": done / elapsed if elapsed else 0.0,
+            "nodes_added": created,
+            "reused_visits": reused,
+            "visits": {} if root is None else {ch.move: ch.visits for ch in root.children},
+        }
+        if stats is not None:
+            stats.stop()
+            stats.playouts += done
+            stats.nodes += created
+
+    def report(self):
+        """Playouts, time, playouts/second and root visit counts of the last search."""
+        return dict(self.last)
+
+
+def ai_mcts_move(board, ai_piece="O", playouts=None, time_limit_ms=None, mcts=None, rng=None,
+                 stats=None, stop=None, spec=None):
+    """
+    Monte Carlo tree search move. Pass the same MCTS for every move of a
+    game to reuse its tree; otherwise a greedy-rollout one is made for
+    spec. Budget, rng, stats and stop are as for MCTS.search (stop raises
+    ai.SearchTimeout, like the minimax searches).
+    """
+    if mcts is None:
+        mcts = MCTS(spec=spec)
+    return mcts.search(board, ai_piece, playouts, time_limit_ms, rng, stats, stop)
+
+
+# ROOT PARALLELISATION
+def _parallel_search(board, piece, playouts, time_limit_ms, seed, options):
+    """Worker task: an independent search. Returns ({col: visits}, playouts)."""
+    mcts = MCTS(**options)
+    mcts.search(board, piece, playouts, time_limit_ms, random.Random(seed))
+    return mcts.last["visits"], mcts.last["playouts"]
+
+
+class RootParallelMCTS:
+    """
+    Root parallelisation on a reusable process pool: every worker grows its
+    own tree from the same position with a different seed, and the move
+    with the most visits over all of them is played. A playout budget is
+    split between the workers; a time limit applies to each of them.
+
+    There is no tree reuse between moves (each search starts fresh), and
+    like parallel.ParallelSearcher the pool can't be interrupted mid-move.
+    """
+
+    def __init__(self, workers=None, exploration=EXPLORATION, rollout="greedy", batch=1,
+                 spec=None):
+        self.workers = workers or os.cpu_count() or 1
+        self.options = {"exploration": exploration, "rollout": rollout, "batch": batch,
+                        "spec": spec or DEFAULT_SPEC}
+        self.spec = self.options["spec"]
+        self.last = {}
+        # Imported here so "import mcts" (and main) doesn't load multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+        self._pool = ProcessPoolExecutor(max_workers=self.workers)
+
+    def search(self, board, piece, playouts=None, time_limit_ms=None, rng=None, stats=None):
+        spec = self.spec
+        rng = rng or random.Random(0)
+        if playouts is None and time_limit_ms is None:
+            playouts = DEFAULT_PLAYOUTS
+        if stats is not None:
+            stats.start("mcts")
+        started = time.perf_counter()
+
+        current, mask = board_bits(board, piece, spec)
+        col = forced_column(current, mask, spec)
+        visits = {}
+        done = 0
+        if col is None:
+            share = None if playouts is None else -(-playouts // self.workers)
+            futures = [self._pool.submit(_parallel_search, board, piece, share, time_limit_ms,
+                                         rng.getrandbits(32), self.options)
+                       for _ in range(self.workers)]
+            for future in futures:
+                worker_visits, worker_playouts = future.result()
+                for move, count in worker_visits.items():
+                    visits[move] = visits.get(move, 0) + count
+                done += worker_playouts
+            most = max(visits.values())
+            best = sorted((c for c in visits if visits[c] == most),
+                          key=lambda c: abs(c - spec.center))
+            col = pick_tied(best, rng)
+
+        elapsed = time.perf_counter() - started
+        self.last = {
+            "playouts": done,
+            "seconds": elapsed,
+            "playouts_per_second": done / elapsed if elapsed else 0.0,
+            "visits": visits,
+        }
+        if stats is not None:
+            stats.stop()
+            stats.playouts += done
+        return col
+
+    def best_move(self, board, ai_piece="O", playouts=None, time_limit_ms=None, rng=None,
+                  stats=None):
+        return self.search(board, ai_piece, playouts, time_limit_ms, rng, stats)
+
+    def report(self):
+        return dict(self.last)
+
+    def close(self):
+        self._pool.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def main():
+    from connect4 import create_board, get_next_open_row, drop_piece
+
+    parser = argparse.ArgumentParser(description="Measure MCTS playouts per second on this host.")
+    parser.add_argument("--moves", default="", help='columns played so far, e.g. "3342"')
+    parser.add_argument("--playouts", type=int, default=None)
+    parser.add_argument("--time-limit-ms", type=int, default=None,
+                        help="budget per search (default: 1000 unless --playouts is given)")
+    parser.add_argument("--rollout", choices=ROLLOUTS, default="greedy")
+    parser.add_argument("--exploration", type=float, default=EXPLORATION)
+    parser.add_argument("--batch", type=int, default=1, help="playouts per new leaf")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="run root-parallel on this many processes")
+    parser.add_argument("--rows", type=int, default=6)
+    parser.add_argument("--cols", type=int, default=7)
+    parser.add_argument("--connect", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    try:
+        spec = board_spec(args.rows, args.cols, args.connect)
+    except ValueError as e:
+        parser.error(str(e))
+    if args.playouts is None and args.time_limit_ms is None:
+        args.time_limit_ms = 1000
+
+    board = create_board(spec)
+    piece = "X"
+    for ch in args.moves:
+        col = int(ch)
+        drop_piece(board, get_next_open_row(board, col), col, piece)
+        piece = "O" if piece == "X" else "X"
+
+    rng = random.Random(args.seed)
+    if args.workers:
+        with RootParallelMCTS(args.workers, args.exploration, args.rollout, args.batch,
+                              spec) as searcher:
+            col = searcher.search(board, piece, args.playouts, args.time_limit_ms, rng)
+            report = searcher.report()
+    else:
+        searcher = MCTS(args.exploration, args.rollout, args.batch, spec)
+        col = searcher.search(board, piece, args.playouts, args.time_limit_ms, rng)
+        report = searcher.report()
+
+    print(f"{piece} plays column {col}")
+    print(f"{report['playouts']:,} playouts in {report['seconds'] * 1000:.0f} ms"
+          f" = {report['playouts_per_second']:,.0f} playouts/s")
+    print("root visits: " + " ".join(f"{c}:{v}" for c, v in sorted(report["visits"].items())))
+
+
+if __name__ == "__main__":
+    main()
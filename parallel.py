@@ -0,0 +1,289 @@
+"""
+Parallel alpha-beta search.
+
+The root moves are independent subtrees, so ParallelSearcher farms each root
+child out to a ProcessPoolExecutor worker running minimax_alpha_beta. The
+best score found so far is shared through a multiprocessing.Value: a worker
+reads it when it starts a subtree and uses it as alpha, so subtrees that
+start later are pruned like they would be in the serial search.
+
+LazySMPSearcher takes the other approach: every worker searches the whole
+tree at a staggered depth, and they cooperate only through a transposition
+table in shared memory (transposition.SharedTranspositionTable).
+
+Keep one searcher for the whole session; the pool is created once and
+reused for every move. Run this module to check that ParallelSearcher
+picks the serial search's move on positions with threats.
+"""
+
+import multiprocessing
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+
+from connect4 import (
+    COLUMN_COUNT,
+    GameState,
+    create_board,
+    drop_piece,
+    get_next_open_row,
+    is_symmetric,
+    is_valid_location,
+    winning_move_at
+)
+from ai import SearchTimeout, drop_temp, get_valid_locations, minimax_alpha_beta
+from threats import analyse, candidate_cells
+from transposition import SharedTranspositionTable
+
+# Set in each worker by _init_worker
+_shared_alpha = None
+
+
+def _init_worker(shared_alpha):
+    global _shared_alpha
+    _shared_alpha = shared_alpha
+
+
+def _search_root_child(board, col, depth, ai_piece):
+    """Worker task: score one root move. Returns (col, score)."""
+    row = get_next_open_row(board, col)
+    temp = drop_temp(board, row, col, ai_piece)
+    if winning_move_at(temp, row, col, ai_piece):
+        score = 10_000_000
+    else:
+        # alpha - 1 so a move that only ties the best so far still gets an
+        # exact score; the earliest of equal moves must win, as in the serial search
+        alpha = _shared_alpha.value - 1
+        _, score = minimax_alpha_beta(temp, depth - 1, alpha, 999999, False, ai_piece)
+
+    with _shared_alpha.get_lock():
+        if score > _shared_alpha.value:
+            _shared_alpha.value = score
+    return col, score
+
+
+class ParallelSearcher:
+    """
+    Root-split alpha-beta search on a reusable process pool.
+
+    workers      - number of processes (default: os.cpu_count())
+    eldest_first - search the first (center) move on its own before
+                   starting the rest, so they all begin with a real alpha
+                   ("young brothers wait")
+    """
+
+    def __init__(self, workers=None, eldest_first=True):
+        self.workers = workers or os.cpu_count() or 1
+        self.eldest_first = eldest_first
+        self._alpha = multiprocessing.Value("q", -999999)
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_init_worker,
+            initargs=(self._alpha,)
+        )
+
+    def search(self, board, depth, ai_piece):
+        """Return (col, score), picking the same move as minimax_alpha_beta."""
+        valid = get_valid_locations(board)
+        if depth == 0 or not valid:
+            return None, None
+        valid.sort(key=lambda c: abs(c - COLUMN_COUNT // 2))
+
+        # Root threats as in minimax_alpha_beta: play a win at once, otherwise
+        # only split the forced block or the moves that don't lose at once
+        state = GameState(board)
+        opp_piece = "O" if ai_piece == "X" else "X"
+        cells, wins = candidate_cells(state.bits[ai_piece], state.bits[opp_piece], state.mask)
+        playable = {col: state.cell_bits[state.heights[col]][col] for col in valid}
+        if wins:
+            return next(col for col in valid if playable[col] & wins), 10_000_000
+        valid = [col for col in valid if playable[col] & cells]
+
+        if is_symmetric(board):
+            # Mirrored moves score the same; search the first of each pair
+            valid = [col for i, col in enumerate(valid) if COLUMN_COUNT - 1 - col not in valid[:i]]
+
+        with self._alpha.get_lock():
+            self._alpha.value = -999999
+
+        results = {}
+        remaining = valid
+        if self.eldest_first and len(valid) > 1:
+            col, score = self._pool.submit(_search_root_child, board, valid[0], depth, ai_piece).result()
+            results[col] = score
+            remaining = valid[1:]
+
+        futures = [self._pool.submit(_search_root_child, board, col, depth, ai_piece)
+                   for col in remaining]
+        for future in futures:
+            col, score = future.result()
+            results[col] = score
+
+        # Earliest move in search order wins ties, like the serial search
+        best_col = valid[0]
+        for col in valid:
+            if results[col] > results[best_col]:
+                best_col = col
+        return best_col, results[best_col]
+
+    def best_move(self, board, ai_piece="O", depth=5):
+        col, _ = self.search(board, depth, ai_piece)
+        return col
+
+    def close(self):
+        self._pool.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# LAZY SMP
+class SharedFlag:
+    """Lock-free stop flag visible to every pool worker (cheap to poll)."""
+
+    def __init__(self):
+        self._value = multiprocessing.Value("b", 0, lock=False)
+
+    def is_set(self):
+        return self._value.value != 0
+
+    def set(self):
+        self._value.value = 1
+
+    def clear(self):
+        self._value.value = 0
+
+
+# Set in each worker by _init_smp_worker
+_smp_tt = None
+_smp_stop = None
+
+
+def _init_smp_worker(tt_name, stop):
+    global _smp_tt, _smp_stop
+    _smp_tt = SharedTranspositionTable.attach(tt_name)
+    _smp_stop = stop
+
+
+def _smp_search(board, depth, ai_piece, first_col):
+    """Worker task: full search sharing the table. Returns (depth, col, score) or None."""
+    try:
+        col, score = minimax_alpha_beta(board, depth, -999999, 999999, True, ai_piece,
+                                        _smp_tt, first_col=first_col, stop=_smp_stop)
+    except SearchTimeout:
+        return None
+    return depth, col, score
+
+
+class LazySMPSearcher:
+    """
+    Lazy SMP: all workers search the same position, half of them one ply
+    deeper, each starting from a different root move. They share results
+    only through the shared-memory transposition table, so nothing but the
+    board is sent between processes.
+
+    The table holds values for one ai_piece; call new_game() between games.
+    """
+
+    def __init__(self, workers=None, tt_entries=1 << 20):
+        self.workers = workers or os.cpu_count() or 1
+        self.tt = SharedTranspositionTable(tt_entries)
+        self._stop = SharedFlag()
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_init_smp_worker,
+            initargs=(self.tt.name, self._stop)
+        )
+
+    def new_game(self):
+        self.tt.clear()
+
+    def search(self, board, depth, ai_piece):
+        """Return (col, score) from the deepest search that finished."""
+        valid = get_valid_locations(board)
+        if depth == 0 or not valid:
+            return None, None
+        valid.sort(key=lambda c: abs(c - COLUMN_COUNT // 2))
+
+        self._stop.clear()
+        # Worker 0 is the main search; helpers are staggered by depth and
+        # root move so they fill the table with different parts of the tree
+        futures = [
+            self._pool.submit(_smp_search, board, depth + (i % 2), ai_piece,
+                              valid[i % len(valid)])
+            for i in range(self.workers)
+        ]
+        main_result = futures[0].result()
+        self._stop.set()
+
+        best = main_result
+        for future in futures[1:]:
+            result = future.result()
+            if result is not None and result[0] > best[0]:
+                best = result
+        return best[1], best[2]
+
+    def best_move(self, board, ai_piece="O", depth=5):
+        col, _ = self.search(board, depth, ai_piece)
+        return col
+
+    def close(self):
+        self._stop.set()
+        self._pool.shutdown(wait=True)
+        self.tt.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def threat_positions(count, seed=0):
+    """
+    Random unfinished positions, each with a win or at least one root move
+    ruled out by threats.candidate_cells. Returns (board, piece to move) pairs.
+    """
+    rng = random.Random(seed)
+    positions = []
+    while len(positions) < count:
+        board = create_board()
+        piece = "X"
+        for _ in range(rng.randrange(6, 30)):
+            col = rng.choice(get_valid_locations(board))
+            row = get_next_open_row(board, col)
+            drop_piece(board, row, col, piece)
+            if winning_move_at(board, row, col, piece):
+                break
+            piece = "O" if piece == "X" else "X"
+        else:
+            threats = analyse(board, piece)
+            open_cols = [c for c in range(COLUMN_COUNT) if is_valid_location(board, c)]
+            if threats["wins"] or len(threats["candidates"]) < len(open_cols):
+                positions.append((board, piece))
+    return positions
+
+
+def check(count=40, depth=4, workers=2, seed=0):
+    """Positions from threat_positions where serial and parallel disagree."""
+    differ = []
+    with ParallelSearcher(workers) as searcher:
+        for board, piece in threat_positions(count, seed):
+            serial, _ = minimax_alpha_beta(board, depth, -999999, 999999, True, piece)
+            parallel, _ = searcher.search(board, depth, piece)
+            if serial != parallel:
+                differ.append((board, piece, serial, parallel))
+    return differ
+
+
+if __name__ == "__main__":
+    for seed in (0, 1):
+        differ = check(seed=seed)
+        print(f"seed {seed}: {len(differ)} of 40 threat positions differ from the serial search")
+        for board, piece, serial, parallel in differ:
+            print(f"  {piece} to move: serial {serial}, parallel {parallel}")
+        if differ:
+            raise SystemExit(1)
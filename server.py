@@ -0,0 +1,669 @@
+"""
+Engine server: many concurrent games over a line-based JSON protocol.
+
+    python server.py serve --port 7654 --workers 4
+    python server.py serve --unix /tmp/connect4.sock
+    python server.py selfplay --port 7654 --games 200 --x ab:4 --o mcts:500
+    python server.py check      # round-trip self-test on a private server
+
+Every request is one JSON object on one line, answered by one line with the
+same "id". Requests on one connection may be in flight together, so the
+replies can come back in any order:
+
+    {"id": 1, "op": "move", "game": "g42", "moves": [3, 3, 2, 4], "level": "ab:5",
+     "time_limit_ms": 500}
+    -> {"id": 1, "ok": true, "col": 3, "score": 12, "warm": true, "ms": 41.2,
+        "stats": {...}}
+    {"id": 2, "op": "end", "game": "g42"}      # the game is over, drop its state
+    {"id": 3, "op": "status"}                  # server counters
+    -> {"id": ..., "ok": false, "error": "..."} when something is wrong
+
+moves are the columns played from the empty board ("X" first), as a list or
+a digit string; the side to move follows from their number. level is a
+player as in arena.py. time_limit_ms is the search budget for ab and mcts
+(for the other levels it only sets the deadline), seed seeds the game's
+tie-breaking, and rows/cols/connect choose the board (default 6 x 7,
+connect 4). score is stats.SearchStats.score and warm tells whether the
+game's search state was reused.
+
+The searches run in worker processes, each a single-process pool. A game
+stays on the worker it was first sent to, and that worker keeps the
+game's search state between moves (transposition table, solver, MCTS tree
+and rng, per side), so it warms up like it does in Connect4Game. Workers
+drop their least recently used games beyond --sessions.
+
+A semaphore bounds the requests in flight; once it is full the server
+stops reading from its sockets, so clients are slowed down by TCP instead
+of piling up work. Every request has a deadline: time_limit_ms plus
+TIMEOUT_SLACK_MS, or --timeout without a limit. The worker shortens the
+search budget to fit what is left of it and stops the search at the
+deadline; the reply is then an error.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from connect4 import (
+    create_board,
+    is_valid_location,
+    get_next_open_row,
+    drop_piece,
+    winning_move_at,
+    board_spec,
+    ROW_COUNT,
+    COLUMN_COUNT,
+    CONNECT
+)
+from ai import ai_random_move, ai_greedy_move, ai_minimax_move, ai_minimax_ab_move, SearchTimeout
+from transposition import TranspositionTable
+from solver import Solver
+from stats import SearchStats
+from mcts import MCTS, ai_mcts_move
+from arena import parse_player
+from benchmark import percentile
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 7654
+# Deadline of requests without a time_limit_ms
+DEFAULT_TIMEOUT_S = 10.0
+MAX_TIME_LIMIT_MS = 30_000
+# Deadline = time limit + this, for queueing and process hand-off
+TIMEOUT_SLACK_MS = 500
+# Games kept per worker; ab games hold two tables of SESSION_TT_ENTRIES
+# (a search table and the solver's, about 0.5 MiB each when empty)
+DEFAULT_SESSIONS = 128
+SESSION_TT_ENTRIES = 1 << 16
+# Requests searched or queued at once, per worker
+PENDING_PER_WORKER = 8
+MAX_BOARD_SIDE = 12
+LINE_LIMIT = 1 << 16
+
+
+class EngineError(Exception):
+    """The server answered a request with an error."""
+
+
+class Deadline:
+    """A stop flag (see ai.minimax_alpha_beta) that sets itself at a wall-clock time."""
+
+    def __init__(self, at):
+        self.at = at
+
+    def is_set(self):
+        return time.time() >= self.at
+
+
+# 1. WORKER SIDE
+class Session:
+    """One side's search state in one game (only the tables its level uses)."""
+
+    __slots__ = ("level", "dims", "tt", "solver", "mcts", "rng")
+
+    def __init__(self, level, dims, seed):
+        self.level = level
+        self.dims = dims
+        self.tt = self.solver = self.mcts = None
+        if level[0] == "ab":
+            self.tt = TranspositionTable(SESSION_TT_ENTRIES)
+            self.solver = Solver(TranspositionTable(SESSION_TT_ENTRIES, policy="always"))
+        elif level[0] == "mcts":
+            self.mcts = MCTS(spec=board_spec(*dims))
+        self.rng = random.Random(seed)
+
+
+# Set in each worker by _init_worker
+_sessions = OrderedDict()   # (game, piece) -> Session, least recently used first
+_max_sessions = DEFAULT_SESSIONS
+
+
+def _init_worker(max_sessions):
+    global _max_sessions
+    _max_sessions = max_sessions
+
+
+def _session(game, piece, level, dims, seed):
+    """(session, warm): the game's state for piece, made fresh if needed."""
+    key = (game, piece)
+    session = _sessions.get(key)
+    if session is not None and session.level == level and session.dims == dims:
+        _sessions.move_to_end(key)
+        return session, True
+    session = Session(level, dims, seed)
+    if game is not None:   # games without an id are searched from scratch
+        _sessions[key] = session
+        while len(_sessions) > _max_sessions:
+            _sessions.popitem(last=False)
+    return session, False
+
+
+def _search(game, level, dims, board, piece, time_limit_ms, seed, expires_at):
+    """Worker task: one move for piece. Returns the reply fields."""
+    left_ms = (expires_at - time.time()) * 1000 - TIMEOUT_SLACK_MS / 2
+    if left_ms <= 0:
+        raise SearchTimeout   # expired in the queue
+    if time_limit_ms is not None:
+        time_limit_ms = min(time_limit_ms, left_ms)
+    stop = Deadline(expires_at)
+
+    session, warm = _session(game, piece, level, dims, seed)
+    name, depth = level
+    spec = board_spec(*dims)
+    rng = session.rng
+    stats = SearchStats()
+    if name == "random":
+        col = ai_random_move(board, rng)
+    elif name == "greedy":
+        col = ai_greedy_move(board, piece, rng, spec=spec)
+    elif name == "minimax":
+        col = ai_minimax_move(board, piece, depth=depth, rng=rng, stats=stats, stop=stop,
+                              spec=spec)
+    elif name == "mcts":
+        playouts = None if time_limit_ms is not None else depth
+        col = ai_mcts_move(board, piece, playouts, time_limit_ms, session.mcts, rng, stats,
+                           stop)
+    else:
+        col = ai_minimax_ab_move(board, piece, depth=depth, tt=session.tt,
+                                 time_limit_ms=time_limit_ms, solver=session.solver, rng=rng,
+                                 stats=stats, stop=stop, spec=spec)
+    return {"col": col, "score": stats.score, "warm": warm, "stats": stats.report()}
+
+
+def _end_game(game):
+    """Worker task: forget both sides of game."""
+    for piece in ("X", "O"):
+        _sessions.pop((game, piece), None)
+
+
+def _ready():
+    return os.getpid()
+
+
+# 2. REQUESTS
+def board_from_moves(moves, spec):
+    """
+    (board, piece to move) after moves from the empty board. ValueError if
+    they are not the moves of a game still in progress.
+    """
+    if isinstance(moves, str):
+        if not all(ch in "0123456789" for ch in moves):
+            raise ValueError("moves must be a list of columns or a string of digits")
+        moves = [int(ch) for ch in moves]
+    if not isinstance(moves, list):
+        raise ValueError("moves must be a list of columns or a string of digits")
+
+    board = create_board(spec)
+    piece = "X"
+    for col in moves:
+        if type(col) is not int or not 0 <= col < spec.cols or not is_valid_location(board, col):
+            raise ValueError(f"illegal move {col!r}")
+        row = get_next_open_row(board, col)
+        drop_piece(board, row, col, piece)
+        if winning_move_at(board, row, col, piece, spec):
+            raise ValueError("the game is already over")
+        piece = "O" if piece == "X" else "X"
+    if len(moves) == spec.rows * spec.cols:
+        raise ValueError("the board is full")
+    return board, piece
+
+
+def parse_move_request(request):
+    """Check a "move" request. Returns the arguments of _search (less expires_at)."""
+    game = request.get("game")
+    if game is not None and not isinstance(game, str):
+        raise ValueError("game must be a string")
+    dims = (request.get("rows", ROW_COUNT), request.get("cols", COLUMN_COUNT),
+            request.get("connect", CONNECT))
+    if not all(type(n) is int and 0 < n <= MAX_BOARD_SIDE for n in dims):
+        raise ValueError(f"rows, cols and connect must be integers from 1 to {MAX_BOARD_SIDE}")
+    spec = board_spec(*dims)
+
+    level = request.get("level", "ab")
+    if not isinstance(level, str):
+        raise ValueError('level must be a string such as "ab:5"')
+    level = parse_player(level)
+
+    time_limit_ms = request.get("time_limit_ms")
+    if time_limit_ms is not None:
+        if (type(time_limit_ms) not in (int, float)
+                or not 0 < time_limit_ms <= MAX_TIME_LIMIT_MS):
+            raise ValueError(f"time_limit_ms must be a number from 1 to {MAX_TIME_LIMIT_MS}")
+    seed = request.get("seed")
+    if seed is not None and type(seed) is not int:
+        raise ValueError("seed must be an integer")
+
+    board, piece = board_from_moves(request.get("moves", []), spec)
+    return game, level, dims, board, piece, time_limit_ms, seed
+
+
+# 3. SERVER
+class EngineServer:
+    """
+    Serves the protocol above on asyncio streams.
+
+    workers     - worker processes (default: os.cpu_count())
+    max_pending - requests searched or queued at once (default:
+                  PENDING_PER_WORKER per worker)
+    timeout     - deadline in seconds of requests without time_limit_ms
+    sessions    - games each worker keeps warm
+    """
+
+    def __init__(self, workers=None, max_pending=None, timeout=DEFAULT_TIMEOUT_S,
+                 sessions=DEFAULT_SESSIONS):
+        self.workers = workers or os.cpu_count() or 1
+        self.timeout = timeout
+        self.sessions = sessions
+        self.pools = [self._new_pool() for _ in range(self.workers)]
+        self.pending = asyncio.Semaphore(max_pending or PENDING_PER_WORKER * self.workers)
+        self.games = OrderedDict()   # game -> worker index, least recently used first
+        self.load = [0] * self.workers   # games per worker
+        self.busy = [0] * self.workers   # requests sent to each worker and not yet answered
+        self.in_flight = 0
+        self.served = 0
+        self.errors = 0
+        self.timeouts = 0
+
+    def _new_pool(self):
+        return ProcessPoolExecutor(max_workers=1, initializer=_init_worker,
+                                   initargs=(self.sessions,))
+
+    async def start(self):
+        """Start the worker processes before the first request needs them."""
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(pool, _ready) for pool in self.pools))
+
+    def close(self):
+        for pool in self.pools:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    def _worker(self, game):
+        """
+        The worker game is pinned to; new games go to the one with fewest.
+        Requests without a game go to the one with the fewest open requests.
+        """
+        if game is None:
+            return min(range(self.workers), key=lambda i: (self.busy[i], self.load[i]))
+        index = self.games.get(game)
+        if index is not None:
+            self.games.move_to_end(game)
+            return index
+        index = min(range(self.workers), key=self.load.__getitem__)
+        self.games[game] = index
+        self.load[index] += 1
+        # The workers have dropped the oldest games' state by now anyway
+        while len(self.games) > self.workers * self.sessions:
+            _, old = self.games.popitem(last=False)
+            self.load[old] -= 1
+        return index
+
+    async def _run(self, index, task, *args, timeout):
+        loop = asyncio.get_running_loop()
+        pool = self.pools[index]
+        self.busy[index] += 1
+        try:
+            return await asyncio.wait_for(loop.run_in_executor(pool, task, *args), timeout)
+        except BrokenProcessPool:
+            # A worker died (its games' state with it): replace it for the next request
+            if self.pools[index] is pool:
+                self.pools[index] = self._new_pool()
+            raise EngineError("worker process failed")
+        finally:
+            self.busy[index] -= 1
+
+    async def answer(self, request):
+        """The reply (without "id") to one decoded request."""
+        op = request.get("op", "move")
+        if op == "status":
+            return {"ok": True, "workers": self.workers, "games": len(self.games),
+                    "in_flight": self.in_flight, "busy": list(self.busy), "served": self.served,
+                    "errors": self.errors, "timeouts": self.timeouts}
+        if op == "end":
+            game = request.get("game")
+            index = self.games.pop(game, None) if isinstance(game, str) else None
+            if index is not None:
+                self.load[index] -= 1
+                await self._run(index, _end_game, game, timeout=self.timeout)
+            return {"ok": True}
+        if op != "move":
+            raise ValueError(f"unknown op {op!r}")
+
+        game, level, dims, board, piece, time_limit_ms, seed = parse_move_request(request)
+        budget = (time_limit_ms + TIMEOUT_SLACK_MS) / 1000 if time_limit_ms else self.timeout
+        started = time.perf_counter()
+        reply = await self._run(self._worker(game), _search, game, level, dims, board, piece,
+                                time_limit_ms, seed, time.time() + budget,
+                                timeout=budget + TIMEOUT_SLACK_MS / 1000)
+        reply["ms"] = round((time.perf_counter() - started) * 1000, 2)
+        return {"ok": True, **reply}
+
+    async def _reply(self, line, writer, lock):
+        request_id = None
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError("a request must be a JSON object")
+            request_id = request.get("id")
+            reply = await self.answer(request)
+            self.served += 1
+        except (SearchTimeout, asyncio.TimeoutError):
+            self.timeouts += 1
+            reply = {"ok": False, "error": "timed out"}
+        except (ValueError, EngineError) as e:
+            self.errors += 1
+            reply = {"ok": False, "error": str(e)}
+        except Exception as e:   # a bug; the client still gets its reply
+            self.errors += 1
+            reply = {"ok": False, "error": f"internal error: {e!r}"}
+
+        data = (json.dumps({"id": request_id, **reply}) + "\n").encode()
+        try:
+            async with lock:
+                writer.write(data)
+                await writer.drain()
+        except ConnectionError:
+            pass   # the client has gone; its other replies are dropped too
+        finally:
+            self.in_flight -= 1
+            self.pending.release()
+
+    async def handle(self, reader, writer):
+        """One client connection; its requests are answered concurrently."""
+        lock = asyncio.Lock()
+        tasks = set()
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except (ValueError, ConnectionError):   # line over LINE_LIMIT, or reset
+                    break
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                # Backpressure: while max_pending requests are open, this
+                # connection waits here and reads nothing more. Idle
+                # connections hold no permit.
+                await self.pending.acquire()
+                self.in_flight += 1
+                task = asyncio.create_task(self._reply(line, writer, lock))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        finally:
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def serve(self, host=DEFAULT_HOST, port=DEFAULT_PORT, path=None):
+        """Serve on TCP host:port, or on the Unix socket path, until cancelled."""
+        await self.start()
+        if path is not None:
+            server = await asyncio.start_unix_server(self.handle, path, limit=LINE_LIMIT)
+        else:
+            server = await asyncio.start_server(self.handle, host, port, limit=LINE_LIMIT)
+        where = path or ", ".join(str(s.getsockname()) for s in server.sockets)
+        print(f"serving on {where} with {self.workers} workers", file=sys.stderr, flush=True)
+        async with server:
+            await server.serve_forever()
+
+
+# 4. CLIENT
+class EngineClient:
+    """
+    Client for one connection; any number of requests can be awaited at once.
+
+        client = await EngineClient.connect(port=7654)
+        reply = await client.move("g42", [3, 3, 2], level="mcts", time_limit_ms=300)
+        await client.end("g42")
+        await client.close()
+    """
+
+    def __init__(self, reader, writer):
+        self._reader = reader
+        self._writer = writer
+        self._waiting = {}   # request id -> Future of the reply
+        self._next_id = 0
+        self._listener = asyncio.create_task(self._listen())
+
+    @classmethod
+    async def connect(cls, host=DEFAULT_HOST, port=DEFAULT_PORT, path=None):
+        if path is not None:
+            reader, writer = await asyncio.open_unix_connection(path, limit=LINE_LIMIT)
+        else:
+            reader, writer = await asyncio.open_connection(host, port, limit=LINE_LIMIT)
+        return cls(reader, writer)
+
+    async def _listen(self):
+        try:
+            while line := await self._reader.readline():
+                reply = json.loads(line)
+                future = self._waiting.pop(reply.get("id"), None)
+                if future is not None and not future.done():
+                    future.set_result(reply)
+        finally:
+            for future in self._waiting.values():
+                if not future.done():
+                    future.set_exception(ConnectionError("connection to the server closed"))
+            self._waiting.clear()
+
+    async def request(self, op, **fields):
+        """Send one request and return the server's reply dict."""
+        if self._listener.done():
+            raise ConnectionError("connection to the server closed")
+        self._next_id += 1
+        request_id = self._next_id
+        future = asyncio.get_running_loop().create_future()
+        self._waiting[request_id] = future
+        self._writer.write((json.dumps({"id": request_id, "op": op, **fields}) + "\n").encode())
+        await self._writer.drain()
+        return await future
+
+    async def move(self, game, moves, level="ab", **fields):
+        """The reply to a move request; raises EngineError if it failed."""
+        if not isinstance(moves, str):   # digit strings are sent as they are
+            moves = list(moves)
+        reply = await self.request("move", game=game, moves=moves, level=level, **fields)
+        if not reply["ok"]:
+            raise EngineError(reply["error"])
+        return reply
+
+    async def end(self, game):
+        return await self.request("end", game=game)
+
+    async def status(self):
+        return await self.request("status")
+
+    async def close(self):
+        self._writer.close()
+        try:
+            await self._writer.wait_closed()
+        except ConnectionError:
+            pass
+        await asyncio.gather(self._listener, return_exceptions=True)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+
+async def selfplay(games, x_level, o_level, time_limit_ms=None, connections=4,
+                   dims=(ROW_COUNT, COLUMN_COUNT, CONNECT), **address):
+    """
+    Play games concurrently through a running server (both sides on it) and
+    print the results and the move latencies: a load test of the server.
+    """
+    spec = board_spec(*dims)
+    clients = [await EngineClient.connect(**address) for _ in range(connections)]
+    levels = {"X": x_level, "O": o_level}
+    limits = {} if time_limit_ms is None else {"time_limit_ms": time_limit_ms}
+    rows, cols, connect = dims
+    latencies = []
+    warm = 0
+
+    async def play(g):
+        nonlocal warm
+        client = clients[g % connections]
+        game = f"selfplay-{os.getpid()}-{g}"
+        board = create_board(spec)
+        moves = []
+        piece = "X"
+        try:
+            while len(moves) < spec.rows * spec.cols:
+                started = time.perf_counter()
+                reply = await client.move(game, moves, levels[piece], seed=g, rows=rows,
+                                          cols=cols, connect=connect, **limits)
+                latencies.append(time.perf_counter() - started)
+                warm += reply["warm"]
+                col = reply["col"]
+                row = get_next_open_row(board, col)
+                drop_piece(board, row, col, piece)
+                moves.append(col)
+                if winning_move_at(board, row, col, piece, spec):
+                    return piece
+                piece = "O" if piece == "X" else "X"
+            return "draw"
+        except EngineError as e:
+            print(f"{game}: {e}", file=sys.stderr)
+            return "error"
+        finally:
+            await client.end(game)
+
+    started = time.perf_counter()
+    try:
+        results = await asyncio.gather(*(play(g) for g in range(games)))
+    finally:
+        for client in clients:
+            await client.close()
+    elapsed = time.perf_counter() - started
+
+    totals = {outcome: results.count(outcome) for outcome in ("X", "O", "draw", "error")}
+    print(f"{x_level} (X) {totals['X']} - {totals['O']} {o_level} (O), {totals['draw']} drawn,"
+          f" {totals['error']} failed")
+    if latencies:
+        print(f"{len(latencies):,} moves in {elapsed:.1f} s = {len(latencies) / elapsed:,.1f} moves/s,"
+              f" {warm / len(latencies):.0%} warm;"
+              f" latency p50 {percentile(latencies, 50) * 1000:.1f} ms,"
+              f" p90 {percentile(latencies, 90) * 1000:.1f} ms,"
+              f" p99 {percentile(latencies, 99) * 1000:.1f} ms")
+    return totals
+
+
+async def self_check():
+    """
+    Start a one-worker server on a free local port and run a few round
+    trips through EngineClient. Returns the failures (empty when all pass).
+    """
+    engine = EngineServer(workers=1, max_pending=1)
+    await engine.start()
+    handlers = set()
+
+    async def handle(reader, writer):
+        handlers.add(asyncio.current_task())
+        await engine.handle(reader, writer)
+
+    server = await asyncio.start_server(handle, DEFAULT_HOST, 0, limit=LINE_LIMIT)
+    port = server.sockets[0].getsockname()[1]
+    failures = []
+    # Idle connections must not hold the only permit
+    idle = [await asyncio.open_connection(DEFAULT_HOST, port) for _ in range(2)]
+    try:
+        async with await EngineClient.connect(port=port) as client:
+            as_string = await asyncio.wait_for(
+                client.move("check-string", "3342", level="ab:3", seed=0), DEFAULT_TIMEOUT_S)
+            as_list = await client.move("check-list", [3, 3, 4, 2], level="ab:3", seed=0)
+            if as_string["col"] != as_list["col"]:
+                failures.append(f"digit string played {as_string['col']}, list {as_list['col']}")
+            reply = await client.request("move", moves="33x")
+            if reply["ok"]:
+                failures.append('moves "33x" were accepted')
+    except (asyncio.TimeoutError, EngineError) as e:
+        failures.append(f"round trip failed: {e!r}")
+    finally:
+        for _, writer in idle:
+            writer.close()
+        # Every connection is closed now; let the handlers see it and finish
+        await asyncio.wait(handlers, timeout=DEFAULT_TIMEOUT_S)
+        server.close()
+        await server.wait_closed()
+        engine.close()
+    return failures
+
+
+def add_address_arguments(parser):
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--unix", metavar="PATH", default=None,
+                        help="use this Unix socket instead of TCP")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Connect 4 engine server (JSON lines).")
+    modes = parser.add_subparsers(dest="mode", required=True)
+
+    serve = modes.add_parser("serve", help="run the server")
+    add_address_arguments(serve)
+    serve.add_argument("--workers", type=int, default=None,
+                       help="worker processes (default: one per CPU)")
+    serve.add_argument("--max-pending", type=int, default=None,
+                       help=f"requests in flight before reading stops "
+                            f"(default: {PENDING_PER_WORKER} per worker)")
+    serve.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT_S,
+                       help="deadline in seconds of requests without time_limit_ms")
+    serve.add_argument("--sessions", type=int, default=DEFAULT_SESSIONS,
+                       help="games each worker keeps warm")
+
+    play = modes.add_parser("selfplay", help="play games through a running server")
+    add_address_arguments(play)
+    play.add_argument("--games", type=int, default=100)
+    play.add_argument("--x", default="ab:4", help="first player's level")
+    play.add_argument("--o", default="mcts:500", help="second player's level")
+    play.add_argument("--time-limit-ms", type=int, default=None)
+    play.add_argument("--connections", type=int, default=4)
+    play.add_argument("--rows", type=int, default=ROW_COUNT)
+    play.add_argument("--cols", type=int, default=COLUMN_COUNT)
+    play.add_argument("--connect", type=int, default=CONNECT)
+
+    modes.add_parser("check", help="round-trip self-test on a private local server")
+    args = parser.parse_args()
+
+    if args.mode == "check":
+        failures = asyncio.run(self_check())
+        print("\n".join(failures) or "all round trips passed")
+        sys.exit(1 if failures else 0)
+    address = {"path": args.unix} if args.unix else {"host": args.host, "port": args.port}
+    if args.mode == "serve":
+        async def run():
+            engine = EngineServer(args.workers, args.max_pending, args.timeout, args.sessions)
+            try:
+                await engine.serve(**address)
+            finally:
+                engine.close()
+        try:
+            asyncio.run(run())
+        except KeyboardInterrupt:
+            pass
+    else:
+        try:
+            for level in (args.x, args.o):
+                parse_player(level)
+        except ValueError as e:
+            parser.error(str(e))
+        asyncio.run(selfplay(args.games, args.x, args.o, args.time_limit_ms,
+                             max(1, args.connections), (args.rows, args.cols, args.connect),
+                             **address))
+
+
+if __name__ == "__main__":
+    main()
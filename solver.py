@@ -0,0 +1,228 @@
+"""
+Perfect-play endgame solver.
+
+Once only a few cells are left, the heuristic in ai.py is no longer needed:
+the position can be searched to the end. This is a negamax version of the
+alpha-beta search in ai.py working on the bitboard Position from connect4.py,
+with the transposition table from transposition.py and null-window probes
+to narrow the score.
+
+Scores follow the usual Connect 4 solver convention:
+    0   draw
+    > 0 the player to move wins; the sooner the win, the higher the score
+    < 0 the player to move loses; the later the loss, the higher the score
+A win with your k-th stone scores (ROW_COUNT * COLUMN_COUNT + 1) // 2 + 1 - k.
+"""
+
+import time
+
+from connect4 import (
+    ROW_COUNT,
+    COLUMN_COUNT,
+    BOTTOM_ROW,
+    BOARD_MASK,
+    COLUMN_MASK,
+    Position,
+    winning_cells
+)
+from transposition import LOWER, UPPER, TranspositionTable
+
+CELLS = ROW_COUNT * COLUMN_COUNT
+MIN_SCORE = -CELLS // 2 + 3
+MAX_SCORE = (CELLS + 1) // 2 - 3
+
+# Center columns first: they take part in the most lines
+COLUMN_ORDER = sorted(range(COLUMN_COUNT), key=lambda c: abs(c - COLUMN_COUNT // 2))
+
+
+# Default table size (about 8 MiB of slots), allocated on the first solve
+TT_ENTRIES = 1 << 20
+
+
+class SolverTimeout(Exception):
+    """Raised when the solver's deadline passes before the result is proven."""
+
+
+def _half(x):
+    """x / 2 rounded toward zero (C-style), used when picking probe values."""
+    return -(-x // 2) if x < 0 else x // 2
+
+
+def _popcount(bits):
+    return bin(bits).count("1")
+
+
+class Solver:
+    """
+    Exact negamax solver. Keep one instance per game so the transposition
+    table carries over between moves. Without a tt, a table of TT_ENTRIES
+    is made on the first solve, so games that never reach the endgame
+    don't pay for it.
+    """
+
+    def __init__(self, tt=None):
+        self.tt = tt
+        self.nodes = 0
+        self.deadline = None
+        self.stop = None
+
+    def negamax(self, current, mask, moves, alpha, beta):
+        """
+        Score of the position, assuming alpha < beta and that the player to
+        move cannot win immediately. Returns a bound if the real score lies
+        outside (alpha, beta).
+        """
+        self.nodes += 1
+        if self.nodes & 1023 == 0 and (
+                (self.deadline is not None and time.perf_counter() >= self.deadline)
+                or (self.stop is not None and self.stop.is_set())):
+            raise SolverTimeout
+
+        # Moves that don't hand the opponent an immediate win
+        possible = (mask + BOTTOM_ROW) & BOARD_MASK
+        opp_wins = winning_cells(current ^ mask, mask)
+        forced = possible & opp_wins
+        if forced:
+            if forced & (forced - 1):
+                # Two threats to block at once: the game is lost
+                return -((CELLS - moves) // 2)
+            possible = forced
+        candidates = possible & ~(opp_wins >> 1)
+        if not candidates:
+            return -((CELLS - moves) // 2)
+
+        if moves >= CELLS - 2:
+            return 0
+
+        # Neither side can win before the end of their next move
+        lower = -((CELLS - 2 - moves) // 2)
+        if alpha < lower:
+            alpha = lower
+            if alpha >= beta:
+                return alpha
+        upper = (CELLS - 1 - moves) // 2
+
+        key = current + mask
+        entry = self.tt.probe(key)
+        if entry is not None:
+            if entry[2] == UPPER:
+                upper = min(upper, entry[3])
+            else:
+                lower = entry[3]
+                if alpha < lower:
+                    alpha = lower
+                    if alpha >= beta:
+                        return alpha
+        if beta > upper:
+            beta = upper
+            if alpha >= beta:
+                return beta
+
+        # Order by how many winning cells the move creates, then by column
+        ordered = []
+        for col in COLUMN_ORDER:
+            move = candidates & COLUMN_MASK[col]
+            if move:
+                threats = _popcount(winning_cells(current | move, mask))
+                ordered.append((-threats, len(ordered), move))
+        ordered.sort()
+
+        other = current ^ mask
+        for _, _, move in ordered:
+            new_mask = mask | move
+            score = -self.negamax(other, new_mask, moves + 1, -beta, -alpha)
+            if score >= beta:
+                self.tt.store(key, CELLS - moves, LOWER, score, None)
+                return score
+            if score > alpha:
+                alpha = score
+
+        self.tt.store(key, CELLS - moves, UPPER, alpha, None)
+        return alpha
+
+    def solve(self, position, lower=None, upper=None):
+        """
+        Exact score of a position, narrowed with null-window probes.
+        lower/upper optionally restrict the range that is searched.
+        """
+        current, mask, moves = position.current, position.mask, position.moves
+        if self.tt is None:
+            self.tt = TranspositionTable(TT_ENTRIES, policy="always")
+
+        if can_win_next(current, mask):
+            return (CELLS + 1 - moves) // 2
+
+        low = -((CELLS - moves) // 2)
+        high = (CELLS + 1 - moves) // 2
+        if lower is not None:
+            low = max(low, lower)
+        if upper is not None:
+            high = min(high, upper)
+
+        while low < high:
+            med = low + (high - low) // 2
+            if med <= 0 and _half(low) < med:
+                med = _half(low)
+            elif med >= 0 and _half(high) > med:
+                med = _half(high)
+            result = self.negamax(current, mask, moves, med, med + 1)
+            if result <= med:
+                high = result
+            else:
+                low = result
+        return low
+
+    def best_move(self, position, deadline=None, stop=None):
+        """
+        Return (col, score) for the player to move. Each column after the
+        first only gets an exact solve if a null-window probe shows it beats
+        the best score so far (PVS at the root).
+
+        Raises SolverTimeout once deadline (a time.perf_counter() value)
+        passes or stop (anything with is_set()) is set.
+        """
+        self.deadline = deadline
+        self.stop = stop
+        try:
+            for col in COLUMN_ORDER:
+                if position.can_play(col) and position.is_winning_move(col):
+                    return col, (CELLS + 1 - position.moves) // 2
+
+            best_col, best_score = None, None
+            for col in COLUMN_ORDER:
+                if not position.can_play(col):
+                    continue
+                child = position.copy()
+                child.play(col)
+
+                if best_col is None:
+                    score = -self.solve(child)
+                else:
+                    # Does this move beat best_score? (child <= -(best_score + 1))
+                    if -self.solve(child, lower=-(best_score + 1), upper=-best_score) <= best_score:
+                        continue
+                    score = -self.solve(child, upper=-(best_score + 1))
+
+                if best_col is None or score > best_score:
+                    best_col, best_score = col, score
+
+            return best_col, best_score
+        finally:
+            self.deadline = None
+            self.stop = None
+
+
+def can_win_next(current, mask):
+    """True if the player to move has a playable winning cell."""
+    return bool(winning_cells(current, mask) & (mask + BOTTOM_ROW) & BOARD_MASK)
+
+
+def empty_cells(board):
+    return sum(row.count(" ") for row in board)
+
+
+def solve_board(board, piece, solver=None, deadline=None, stop=None):
+    """Solve a list-of-strings board for piece to move. Returns (col, score)."""
+    if solver is None:
+        solver = Solver()
+    return solver.best_move(Position.from_board(board, piece), deadline, stop)
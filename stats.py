@@ -0,0 +1,142 @@
+"""
+Search instrumentation.
+
+Pass a SearchStats as stats= to minimax, minimax_alpha_beta or the ai_*_move
+functions to see where a move's time went: nodes, leaf evaluations, win
+checks, cutoffs per ply, branching factor, transposition-table hits and the
+time and nodes of every iterative-deepening iteration, and the playouts of
+mcts.py. Without it (the default) the searches only pay for an
+"is not None" check per node.
+
+With trace_depth > 0 the nodes are also counted per line of play from the
+root (the first trace_depth moves), and write_collapsed() saves them in the
+collapsed-stack format read by flamegraph.pl and speedscope:
+
+    stats = SearchStats(trace_depth=4)
+    ai_minimax_ab_move(board, "O", depth=6, stats=stats)
+    print(stats.summary())
+    stats.write_collapsed("search.folded")
+"""
+
+import time
+from collections import Counter
+
+
+class SearchStats:
+    """Counters filled in by the searches (all of them add up across moves)."""
+
+    def __init__(self, trace_depth=0):
+        self.nodes = 0
+        self.leaf_evals = 0
+        self.win_checks = 0
+        self.expanded = 0         # interior nodes whose moves were searched
+        self.children = 0         # moves searched from those nodes
+        self.cutoffs = []         # cutoffs[ply]
+        self.tt_probes = 0
+        self.tt_hits = 0
+        self.tt_cutoffs = 0       # hits that answered the node on their own
+        self.solver_nodes = 0
+        self.playouts = 0         # Monte Carlo playouts (mcts.py)
+        self.score = None         # value of the last move chosen (see ai_minimax_ab_move, MCTS)
+        self.iterations = []      # (depth, seconds, nodes) per completed search
+        self.seconds = 0.0
+
+        self.trace_depth = trace_depth
+        self.path = []            # columns played from the root
+        self.stacks = Counter()
+        self._label = "search"
+        self._started = None
+        self._start_nodes = 0
+
+    # Called by the searches
+    def visit(self):
+        self.nodes += 1
+        if self.trace_depth:
+            self.stacks[(self._label,) + tuple(self.path[:self.trace_depth])] += 1
+
+    def cutoff(self, ply):
+        while len(self.cutoffs) <= ply:
+            self.cutoffs.append(0)
+        self.cutoffs[ply] += 1
+
+    def start(self, label):
+        """Start timing a search from the root; label names it in traces."""
+        self._label = label
+        self.path.clear()
+        self._started = time.perf_counter()
+        self._start_nodes = self.nodes
+
+    def stop(self):
+        """Stop timing and return the seconds since start()."""
+        elapsed = time.perf_counter() - self._started
+        self.seconds += elapsed
+        self.path.clear()
+        return elapsed
+
+    def begin_iteration(self, depth):
+        self.start(f"depth {depth}")
+
+    def end_iteration(self, depth, completed=True):
+        """Only searches that completed are listed in iterations."""
+        elapsed = self.stop()
+        if completed:
+            self.iterations.append((depth, elapsed, self.nodes - self._start_nodes))
+
+    # Reporting
+    def branching_factor(self):
+        """Average number of moves searched per interior node."""
+        return self.children / self.expanded if self.expanded else 0.0
+
+    def report(self):
+        return {
+            "nodes": self.nodes,
+            "leaf_evals": self.leaf_evals,
+            "win_checks": self.win_checks,
+            "cutoffs_per_ply": list(self.cutoffs),
+            "branching_factor": self.branching_factor(),
+            "tt_probes": self.tt_probes,
+            "tt_hits": self.tt_hits,
+            "tt_cutoffs": self.tt_cutoffs,
+            "solver_nodes": self.solver_nodes,
+            "playouts": self.playouts,
+            "playouts_per_second": self.playouts / self.seconds if self.seconds else 0.0,
+            "score": self.score,
+            "iterations": [
+                {"depth": d, "seconds": s, "nodes": n} for d, s, n in self.iterations
+            ],
+            "seconds": self.seconds,
+            "nodes_per_second": self.nodes / self.seconds if self.seconds else 0.0,
+        }
+
+    def summary(self):
+        """One line for the game log."""
+        parts = [
+            f"{self.nodes:,} nodes in {self.seconds * 1000:.0f} ms",
+            f"{self.nodes / self.seconds:,.0f} n/s" if self.nodes and self.seconds else "",
+            f"leaves {self.leaf_evals:,}",
+            f"win checks {self.win_checks:,}",
+            f"cutoffs {sum(self.cutoffs):,}",
+            f"bf {self.branching_factor():.2f}",
+        ]
+        if self.tt_probes:
+            parts.append(f"tt hits {self.tt_hits / self.tt_probes:.0%}")
+        if self.solver_nodes:
+            parts.append(f"solver {self.solver_nodes:,} nodes")
+        if self.playouts:
+            rate = f" ({self.playouts / self.seconds:,.0f}/s)" if self.seconds else ""
+            parts.append(f"playouts {self.playouts:,}{rate}")
+        if self.iterations:
+            parts.append("depths " + " ".join(f"{d}:{s * 1000:.0f}ms" for d, s, _ in self.iterations))
+        return ", ".join(p for p in parts if p)
+
+    def collapsed(self):
+        """Lines "depth 5;col 3;col 2 1234" (node counts per traced line of play)."""
+        return [
+            ";".join((stack[0],) + tuple(f"col {c}" for c in stack[1:])) + f" {count}"
+            for stack, count in sorted(self.stacks.items())
+        ]
+
+    def write_collapsed(self, path):
+        with open(path, "w") as f:
+            for line in self.collapsed():
+                f.write(line + "\n")
@@ -0,0 +1,81 @@
+"""
+Threat analysis on bitboards.
+
+Before searching a position it pays to look at what is forced:
+    wins   - playable cells that win at once for the player to move
+    blocks - playable cells the opponent would win on next move; unless the
+             player to move wins first, one of them must be filled
+    unsafe - playable cells directly under an opponent winning cell;
+             playing there lets the opponent win on top of it
+
+From those, candidate_cells() keeps only the moves worth searching: the
+win, else the forced block, else every move that is not unsafe (all moves
+if none is safe). minimax_alpha_beta uses it at every node, and
+ai_minimax_ab_move answers without searching when there is a win or only
+one candidate.
+
+Cells use the bitboard layout of connect4.BoardSpec (see spec.cell_bits),
+so the analysis works for any board size and win length.
+"""
+
+from connect4 import DEFAULT_SPEC, GameState
+
+
+def threat_cells(mine, theirs, mask, spec=DEFAULT_SPEC):
+    """
+    (wins, blocks, unsafe, playable) cell masks for the player whose
+    stones are mine; theirs are the opponent's and mask every stone.
+    """
+    playable = (mask + spec.bottom_row) & spec.board_mask
+    their_cells = spec.winning_cells(theirs, mask)
+    return (spec.winning_cells(mine, mask) & playable,
+            their_cells & playable,
+            (their_cells >> 1) & playable,
+            playable)
+
+
+def candidate_cells(mine, theirs, mask, spec=DEFAULT_SPEC):
+    """
+    (cells, wins): the playable cells worth searching and the winning ones.
+    When wins is non-zero, cells == wins. With two or more blocks the game
+    is lost; cells are the blocks then (they delay it best).
+    """
+    playable = (mask + spec.bottom_row) & spec.board_mask
+    wins = spec.winning_cells(mine, mask) & playable
+    if wins:
+        return wins, wins
+    their_cells = spec.winning_cells(theirs, mask)
+    blocks = their_cells & playable
+    if blocks:
+        return blocks, 0
+    return (playable & ~(their_cells >> 1)) or playable, 0
+
+
+def _columns(cells, spec):
+    h = spec.bits_per_column
+    cols = []
+    while cells:
+        low = cells & -cells
+        cols.append((low.bit_length() - 1) // h)
+        cells ^= low
+    return cols
+
+
+def analyse(board, piece, spec=None):
+    """
+    Threats for piece to move on a list-of-strings board, as column lists:
+    {"wins", "blocks", "unsafe", "candidates"} (see the module docstring).
+    """
+    state = GameState(board, spec)
+    spec = state.spec
+    opp_piece = "O" if piece == "X" else "X"
+    mine, theirs, mask = state.bits[piece], state.bits[opp_piece], state.mask
+    wins, blocks, unsafe, _ = threat_cells(mine, theirs, mask, spec)
+    cells, _ = candidate_cells(mine, theirs, mask, spec)
+    return {
+        "wins": _columns(wins, spec),
+        "blocks": _columns(blocks, spec),
+        "unsafe": _columns(unsafe, spec),
+        "candidates": _columns(cells, spec),
+    }
+
@@ -0,0 +1,313 @@
+"""
+Transposition table for the alpha-beta search.
+
+Connect 4 reaches the same position through many different move orders, so
+minimax_alpha_beta stores every searched node here, keyed by a Zobrist hash
+of the board. The table has a fixed number of slots (its memory cap) and
+replaces entries with either a depth-preferred or an always-replace policy.
+
+The board is symmetric left to right, so a position and its mirror image
+share one entry: the search also hashes the board with mirrored keys and
+uses the smaller of the two hashes (see canonical_key).
+"""
+
+import random
+from functools import lru_cache
+
+from connect4 import DEFAULT_SPEC
+
+# Bound flags stored with each entry
+EXACT = 0
+LOWER = 1   # real value >= stored value (search failed high)
+UPPER = 2   # real value <= stored value (search failed low)
+
+# Zobrist keys: one random 64-bit number per (piece, row, col).
+# Seeded so every process (and every run) hashes boards the same way.
+_rng = random.Random(3346)
+ZOBRIST = {
+    piece: [[_rng.getrandbits(64) for _ in range(DEFAULT_SPEC.cols)] for _ in range(DEFAULT_SPEC.rows)]
+    for piece in ("X", "O")
+}
+# XOR-ed in on maximizing nodes so the same board with the other side to
+# move gets its own entry.
+ZOBRIST_MAX = _rng.getrandbits(64)
+
+
+@lru_cache(maxsize=None)
+def zobrist_table(spec=None):
+    """Zobrist keys for a board geometry (ZOBRIST for the standard board)."""
+    if spec is None or (spec.rows, spec.cols) == (DEFAULT_SPEC.rows, DEFAULT_SPEC.cols):
+        return ZOBRIST
+    rng = random.Random(f"3346:{spec.rows}x{spec.cols}")
+    return {
+        piece: [[rng.getrandbits(64) for _ in range(spec.cols)] for _ in range(spec.rows)]
+        for piece in ("X", "O")
+    }
+
+
+def mirrored_keys(keys):
+    """Zobrist keys of the mirror image: (row, col) gets the key of (row, cols - 1 - col)."""
+    return {piece: [row[::-1] for row in table] for piece, table in keys.items()}
+
+
+# zobrist_hash(board, ZOBRIST_MIRROR) is the hash of the board's mirror image
+ZOBRIST_MIRROR = mirrored_keys(ZOBRIST)
+
+
+@lru_cache(maxsize=None)
+def mirror_table(spec=None):
+    """Mirrored Zobrist keys for a board geometry (ZOBRIST_MIRROR for the standard board)."""
+    keys = zobrist_table(spec)
+    return ZOBRIST_MIRROR if keys is ZOBRIST else mirrored_keys(keys)
+
+
+def canonical_key(key, mirror_key):
+    """
+    (table key, flipped) for a position hashed both ways. flipped is True
+    when the entry belongs to the mirror image, so stored columns have to
+    be reflected (col -> cols - 1 - col) on the way in and out.
+    """
+    if mirror_key < key:
+        return mirror_key, True
+    return key, False
+
+
+# Rough CPython cost of one stored entry (slot pointer + 5-tuple + ints),
+# used to turn a megabyte budget into a slot count.
+ENTRY_BYTES = 120
+
+
+def zobrist_hash(board, keys=ZOBRIST):
+    """
+    Full Zobrist hash of a board. The search updates it incrementally.
+    Pass keys=zobrist_table(spec) for boards of another size.
+    """
+    key = 0
+    for r, row in enumerate(board):
+        for c, piece in enumerate(row):
+            if piece != " ":
+                key ^= keys[piece][r][c]
+    return key
+
+
+class TranspositionTable:
+    """
+    Fixed-size hash table of search results.
+
+    Each slot holds a tuple (key, depth, flag, value, best_col) or None.
+    Values are from the AI's point of view, so one table should only be used
+    for one ai_piece (Connect4Game creates a fresh table every game).
+
+    policy:
+        "depth"  - keep the existing entry if it was searched deeper
+        "always" - the newest result always wins the slot
+    """
+
+    def __init__(self, max_entries=1 << 18, policy="depth"):
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        if policy not in ("depth", "always"):
+            raise ValueError(f"Unknown replacement policy: {policy}")
+
+        self.max_entries = max_entries
+        self.policy = policy
+        self.slots = [None] * max_entries
+
+        self.hits = 0
+        self.misses = 0
+        self.collisions = 0   # slot held a different position (counted as a miss too)
+        self.stores = 0
+        self.overwrites = 0   # a different position was evicted
+
+    @classmethod
+    def from_megabytes(cls, megabytes, policy="depth"):
+        """Size the table from an approximate memory budget."""
+        return cls(max(1, int(megabytes * 1024 * 1024) // ENTRY_BYTES), policy)
+
+    def probe(self, key):
+        """Return the stored entry for key, or None."""
+        entry = self.slots[key % self.max_entries]
+        if entry is None:
+            self.misses += 1
+            return None
+        if entry[0] != key:
+            self.misses += 1
+            self.collisions += 1
+            return None
+        self.hits += 1
+        return entry
+
+    def store(self, key, depth, flag, value, best_col):
+        index = key % self.max_entries
+        old = self.slots[index]
+
+        if old is not None and old[0] != key:
+            if self.policy == "depth" and old[1] > depth:
+                return
+            self.overwrites += 1
+
+        self.slots[index] = (key, depth, flag, value, best_col)
+        self.stores += 1
+
+    def clear(self):
+        self.slots = [None] * self.max_entries
+        self.hits = self.misses = self.collisions = 0
+        self.stores = self.overwrites = 0
+
+    def filled(self):
+        """Number of occupied slots."""
+        return sum(1 for entry in self.slots if entry is not None)
+
+    def stats(self):
+        """Counters for sizing the table."""
+        probes = self.hits + self.misses
+        return {
+            "max_entries": self.max_entries,
+            "approx_bytes": self.max_entries * ENTRY_BYTES,
+            "filled": self.filled(),
+            "hits": self.hits,
+            "misses": self.misses,
+            "collisions": self.collisions,
+            "stores": self.stores,
+            "overwrites": self.overwrites,
+            "hit_rate": self.hits / probes if probes else 0.0,
+        }
+
+
+# SHARED-MEMORY TABLE (multi-process search)
+# Every slot is two 64-bit words: (key ^ data, data). A reader only accepts
+# an entry if the XOR of the two words gives back its key, so a slot torn by
+# two processes writing at once is simply treated as a miss - no locks.
+#
+# data layout (low to high bits):
+#   0-31  value + 2**31
+#   32-39 depth
+#   40-41 flag
+#   42-45 best column (15 = none)
+#   63    always set, so an all-zero slot never matches
+_VALUE_OFFSET = 1 << 31
+_NO_COL = 15
+_USED = 1 << 63
+_HEADER_WORDS = 2   # word 0 holds the slot count
+
+
+def _pack(depth, flag, value, best_col):
+    col = _NO_COL if best_col is None else best_col
+    return (_USED | (col << 42) | (flag << 40) | (min(depth, 255) << 32)
+            | (value + _VALUE_OFFSET))
+
+
+def _unpack(key, data):
+    col = (data >> 42) & 0xF
+    return (key, (data >> 32) & 0xFF, (data >> 40) & 0x3,
+            (data & 0xFFFFFFFF) - _VALUE_OFFSET, None if col == _NO_COL else col)
+
+
+class SharedTranspositionTable:
+    """
+    TranspositionTable laid out in a multiprocessing.shared_memory block so
+    several worker processes can read and write the same entries.
+
+    Same probe/store/stats interface as TranspositionTable. The process that
+    creates the table owns it and must call unlink() when done; workers
+    call SharedTranspositionTable.attach(name). Counters are per process.
+    """
+
+    def __init__(self, max_entries=1 << 20, policy="depth", name=None):
+        from multiprocessing import shared_memory
+
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        if policy not in ("depth", "always"):
+            raise ValueError(f"Unknown replacement policy: {policy}")
+
+        self.policy = policy
+        if name is None:
+            size = (_HEADER_WORDS + 2 * max_entries) * 8
+            self._shm = shared_memory.SharedMemory(create=True, size=size)
+            self._owner = True
+            self._words = self._shm.buf.cast("Q")
+            self._words[0] = max_entries
+        else:
+            self._shm = shared_memory.SharedMemory(name=name)
+            self._owner = False
+            self._words = self._shm.buf.cast("Q")
+        self.max_entries = self._words[0]
+        self.name = self._shm.name
+
+        self.hits = 0
+        self.misses = 0
+        self.collisions = 0
+        self.stores = 0
+        self.overwrites = 0
+
+    @classmethod
+    def attach(cls, name, policy="depth"):
+        """Open a table created by another process (e.g. a pool worker)."""
+        return cls(policy=policy, name=name)
+
+    def probe(self, key):
+        words = self._words
+        index = _HEADER_WORDS + 2 * (key % self.max_entries)
+        check = words[index]
+        data = words[index + 1]
+        if data == 0:
+            self.misses += 1
+            return None
+        if check ^ data != key:
+            self.misses += 1
+            self.collisions += 1
+            return None
+        self.hits += 1
+        return _unpack(key, data)
+
+    def store(self, key, depth, flag, value, best_col):
+        words = self._words
+        index = _HEADER_WORDS + 2 * (key % self.max_entries)
+        old_data = words[index + 1]
+
+        if old_data and words[index] ^ old_data != key:
+            if self.policy == "depth" and (old_data >> 32) & 0xFF > depth:
+                return
+            self.overwrites += 1
+
+        data = _pack(depth, flag, value, best_col)
+        words[index] = key ^ data
+        words[index + 1] = data
+        self.stores += 1
+
+    def clear(self):
+        self._shm.buf[_HEADER_WORDS * 8:(_HEADER_WORDS + 2 * self.max_entries) * 8] = \
+            bytes(16 * self.max_entries)
+        self.hits = self.misses = self.collisions = 0
+        self.stores = self.overwrites = 0
+
+    def filled(self):
+        words = self._words
+        return sum(1 for i in range(_HEADER_WORDS + 1, len(words), 2) if words[i])
+
+    def stats(self):
+        probes = self.hits + self.misses
+        return {
+            "max_entries": self.max_entries,
+            "approx_bytes": self.max_entries * 16,
+            "filled": self.filled(),
+            "hits": self.hits,
+            "misses": self.misses,
+            "collisions": self.collisions,
+            "stores": self.stores,
+            "overwrites": self.overwrites,
+            "hit_rate": self.hits / probes if probes else 0.0,
+        }
+
+    def close(self):
+        """Detach this process from the table."""
+        self._words.release()
+        self._shm.close()
+
+    def unlink(self):
+        """Close and free the shared block (owner only)."""
+        self.close()
+        if self._owner:
+            self._shm.unlink()
+